@@ -0,0 +1,249 @@
+# Headless benchmark of the web app.
+# Runs main.py through Streamlit's AppTest with the network stubbed out, then times every
+# page section's figures directly. Each measurement runs in a fresh interpreter so cold
+# start and peak RSS are comparable across commits.
+#
+#   python benchmarks/bench_app.py --output bench.json
+#   python benchmarks/bench_app.py --baseline bench.json --threshold 0.25   # exit 1 on regression
+#   python benchmarks/bench_app.py --scale 2x1 --scale 4x2                   # provinces x years
+import argparse
+import io
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(BASE_DIR, "main.py")
+GEOJSON_PATH = os.path.join(BASE_DIR, "indonesia.geojson")
+# Differences below these floors are noise, not regressions
+ABSOLUTE_FLOORS = {"seconds": 0.005, "bytes": 1024, "mb": 5}
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+# Refuse outbound connections and serve any remote GeoJSON from the bundled file, so older
+# commits that still download indonesia.geojson can be benchmarked offline too.
+def stub_network():
+    def refuse(self, address):
+        raise OSError(f"network access is disabled in benchmarks ({address})")
+    socket.socket.connect = refuse
+
+    try:
+        import requests
+    except ImportError:
+        requests = None
+    if requests is not None:
+        class LocalResponse:
+            status_code = 200
+
+            def __init__(self, url):
+                with open(GEOJSON_PATH, encoding="utf-8") as f:
+                    self.text = f.read()
+
+            def json(self):
+                return json.loads(self.text)
+
+        requests.get = lambda url, *args, **kwargs: LocalResponse(url)
+
+    try:
+        import geopandas
+    except ImportError:
+        geopandas = None
+    if geopandas is not None:
+        read_file = geopandas.read_file
+        geopandas.read_file = lambda path, *args, **kwargs: read_file(
+            GEOJSON_PATH if str(path).startswith("http") else path, *args, **kwargs)
+
+
+def measure_app(reruns, ignore_prebuilt):
+    stub_network()
+    sys.path.insert(0, BASE_DIR)
+    if ignore_prebuilt:
+        try:
+            import prebuild
+            prebuild.load_prebuilt = lambda name, out_dir=None: None
+        except ImportError:
+            pass
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"main.py raised: {at.exception}")
+    warm = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+    return {"cold_start_seconds": cold, "warm_rerun_seconds": statistics.median(warm),
+            "charts_rendered": len(at.get("plotly_chart")), "peak_rss_mb": peak_rss_mb()}
+
+
+# Replicate the provinces (renamed copies) and the years (shifted back in time)
+def synthetic_frame(df, provinces, years, national):
+    import pandas as pd
+    df = df.astype({"Province": str})
+    regional = df[df["Province"] != national]
+    copies = [regional.assign(Province=regional["Province"] + ("" if k == 0 else f" #{k}")) for k in range(provinces)]
+    scaled = pd.concat([df[df["Province"] == national], *copies])
+    span = scaled["Year"].max() - scaled["Year"].min() + 1
+    scaled = pd.concat([scaled.assign(Year=scaled["Year"] - k*span) for k in range(years)])
+    return scaled.sort_values(["Province", "Year"]).reset_index(drop=True).astype({"Province": "category"})
+
+
+def measure_charts(repeats, scale):
+    sys.path.insert(0, BASE_DIR)
+    import plotly.io as pio
+
+    import cache
+    import charts
+    import data
+    try:
+        from compact import compact_figure
+    except ImportError:
+        compact_figure = None
+
+    start = time.perf_counter()
+    data.load_dataset()
+    result = {"dataset_load_seconds": time.perf_counter() - start, "sections": {}}
+    if scale:
+        provinces, years = scale
+        scaled = synthetic_frame(data.load_data(), provinces, years, data.NATIONAL)
+        data.load_data = lambda *args: scaled
+        cache.clear_all()
+        result["rows"] = len(scaled)
+
+    for section, names in charts.SECTIONS.items():
+        entry = {"build_seconds": 0.0, "json_bytes": 0, "charts": {}}
+        for name in names:
+            timings = []
+            for _ in range(repeats):
+                # Keep the loaded dataset, rebuild the derived slices and the figure
+                cache.slice_cache.clear()
+                start = time.perf_counter()
+                fig = charts.CHARTS[name]()
+                timings.append(time.perf_counter() - start)
+            # Measure what is sent to the browser, i.e. after compaction where the tree has it
+            if compact_figure:
+                fig = compact_figure(fig)
+            size = len(pio.to_json(fig, validate=False).encode())
+            entry["charts"][name] = {"build_seconds": statistics.median(timings), "json_bytes": size}
+            entry["build_seconds"] += statistics.median(timings)
+            entry["json_bytes"] += size
+        result["sections"][section] = entry
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_child(*args):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), *args], cwd=BASE_DIR,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+# Metrics that grew by more than the threshold (and by more than the noise floor)
+def regressions(results, baseline, threshold):
+    current, previous = flatten(results), flatten(baseline)
+    found = []
+    for key, value in current.items():
+        old = previous.get(key)
+        unit = next((unit for unit in ABSOLUTE_FLOORS if key.endswith(unit)), None)
+        if old is None or unit is None:
+            continue
+        if value > old * (1 + threshold) and value - old > ABSOLUTE_FLOORS[unit]:
+            found.append((key, old, value))
+    return found
+
+
+def report(results):
+    out = io.StringIO()
+    app = results["app"]
+    out.write(f"commit {results['commit']}\n")
+    out.write(f"cold start    {app['cold_start_seconds']:8.3f}s\n")
+    out.write(f"warm rerun    {app['warm_rerun_seconds']:8.3f}s\n")
+    out.write(f"peak RSS      {app['peak_rss_mb']:8.1f} MB\n")
+    for label, charts in [("1x1", results["charts"])] + list(results.get("scale", {}).items()):
+        out.write(f"\nsections at scale {label} (dataset load {charts['dataset_load_seconds']:.3f}s, "
+                  f"peak RSS {charts['peak_rss_mb']:.1f} MB)\n")
+        for section, entry in charts["sections"].items():
+            out.write(f"  {section:<12} {entry['build_seconds']:8.3f}s {entry['json_bytes']:>10} bytes\n")
+    return out.getvalue()
+
+
+def parse_scale(value):
+    provinces, years = value.lower().split("x")
+    return int(provinces), int(years)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold start, reruns and per-section chart cost.")
+    parser.add_argument("--reruns", type=int, default=5, help="warm reruns to time (median is reported)")
+    parser.add_argument("--repeats", type=int, default=3, help="builds per chart (median is reported)")
+    parser.add_argument("--scale", action="append", default=[], type=parse_scale, metavar="PxY",
+                        help="also time the sections with P times the provinces and Y times the years")
+    parser.add_argument("--ignore-prebuilt", action="store_true", help="build figures even if prebuilt specs exist")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    parser.add_argument("--child", choices=["app", "charts"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        warnings.simplefilter("ignore")
+        if args.child == "app":
+            result = measure_app(args.reruns, args.ignore_prebuilt)
+        else:
+            result = measure_charts(args.repeats, args.scale[0] if args.scale else None)
+        print(json.dumps(result))
+        return
+
+    app_args = ["--child", "app", "--reruns", str(args.reruns)] + (["--ignore-prebuilt"] if args.ignore_prebuilt else [])
+    results = {"commit": git_revision(), "app": run_child(*app_args),
+               "charts": run_child("--child", "charts", "--repeats", str(args.repeats))}
+    if args.scale:
+        results["scale"] = {f"{p}x{y}": run_child("--child", "charts", "--repeats", str(args.repeats), "--scale", f"{p}x{y}")
+                            for p, y in args.scale}
+    print(report(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(results, json.load(f), args.threshold)
+        for key, old, new in found:
+            print(f"REGRESSION {key}: {old:.4g} -> {new:.4g}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# Load test of the web app with many concurrent sessions.
+# Runs N AppTest sessions of main.py on threads of one process, the way the Streamlit server
+# runs them, so they share the process-wide caches. Each session opens the page and then
+# changes the sidebar filters a few times. Reports latency percentiles of every script run and
+# the memory each extra session costs, with shared state on and off (APP_SHARED_STATE), each
+# mode in a fresh interpreter. With --cold there is no warm-up session, so the sessions build the
+# first figures concurrently and the memory per session includes the caches they fill.
+#
+#   python benchmarks/load_test.py --sessions 16 --steps 5
+#   python benchmarks/load_test.py --mode shared --output load.json
+#   python benchmarks/load_test.py --cold
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import warnings
+
+from bench_app import APP_PATH, BASE_DIR, peak_rss_mb, stub_network
+
+MODES = {"shared": "1", "copies": "0"}
+YEARS = range(2010, 2022)
+INDICATORS = ["GDI", "GEM", "LE_gap", "ASY_ratio", "SI_ratio"]
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+
+def percentiles(values):
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50_seconds": pick(0.5), "p95_seconds": pick(0.95), "p99_seconds": pick(0.99),
+            "max_seconds": ordered[-1], "runs": len(ordered)}
+
+
+# One visitor: open the page, then change a random filter per step
+def session(index, steps, seed, provinces, timings, apps, errors):
+    from streamlit.testing.v1 import AppTest
+    rng = random.Random(seed + index)
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    try:
+        start = time.perf_counter()
+        at.run()
+        timings["open"].append(time.perf_counter() - start)
+        for _ in range(steps):
+            change = rng.choice(["year", "provinces", "indicator"])
+            if change == "year":
+                at.select_slider(key="year").set_value(rng.choice(YEARS))
+            elif change == "provinces":
+                at.multiselect(key="provinces").set_value(rng.sample(provinces, rng.randint(0, 3)))
+            else:
+                at.selectbox(key="indicator").set_value(rng.choice(INDICATORS))
+            start = time.perf_counter()
+            at.run()
+            timings["filter"].append(time.perf_counter() - start)
+        if at.exception:
+            errors.append(str(at.exception))
+    except Exception as exc:
+        errors.append(repr(exc))
+    # Keep the session alive until every session is done, so its memory is counted
+    apps.append(at)
+
+
+def measure(sessions, steps, seed, cold=False):
+    stub_network()
+    sys.path.insert(0, BASE_DIR)
+    import cache
+    import data
+
+    # The options of the provinces filter
+    provinces = sorted(name for name in data.load_dataset().province_names if name != data.NATIONAL)
+
+    # Warm the process-wide caches with one session, then measure what each extra session adds.
+    # Cold sessions start from empty caches, as in a freshly started server.
+    if cold:
+        cache.clear_all()
+    else:
+        session(-1, steps, seed, provinces, {"open": [], "filter": []}, [], [])
+    gc.collect()
+    baseline = current_rss_mb()
+
+    timings, apps, errors = {"open": [], "filter": []}, [], []
+    threads = [threading.Thread(target=session, args=(i, steps, seed, provinces, timings, apps, errors)) for i in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    gc.collect()
+    loaded = current_rss_mb()
+    return {"sessions": sessions, "cold": cold, "wall_seconds": wall, "errors": errors,
+            "open": percentiles(timings["open"]), "filter": percentiles(timings["filter"]),
+            "all": percentiles(timings["open"] + timings["filter"]),
+            "baseline_rss_mb": baseline, "per_session_mb": (loaded - baseline) / sessions,
+            "peak_rss_mb": peak_rss_mb(), "caches": [c.stats() for c in cache.CACHES]}
+
+
+def run_child(mode, *args):
+    env = {**os.environ, "APP_SHARED_STATE": MODES[mode]}
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *args], cwd=BASE_DIR, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(results):
+    lines = []
+    for mode, result in results.items():
+        lines.append(f"{mode}: {result['sessions']} {'cold ' if result['cold'] else ''}sessions in {result['wall_seconds']:.2f}s, "
+                     f"{result['per_session_mb']:.1f} MB per session, peak RSS {result['peak_rss_mb']:.1f} MB")
+        for kind in ("open", "filter", "all"):
+            p = result[kind]
+            lines.append(f"  {kind:<7} p50 {p['p50_seconds']:7.3f}s  p95 {p['p95_seconds']:7.3f}s  "
+                         f"p99 {p['p99_seconds']:7.3f}s  max {p['max_seconds']:7.3f}s  ({p['runs']} runs)")
+        for error in result["errors"]:
+            lines.append(f"  ERROR {error}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions and report latency and memory per session.")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions (default 8)")
+    parser.add_argument("--steps", type=int, default=4, help="filter changes per session (default 4)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the filter changes")
+    parser.add_argument("--mode", choices=["both", *MODES], default="both", help="APP_SHARED_STATE on, off or both")
+    parser.add_argument("--cold", action="store_true", help="start the sessions together in a cold process, without warm-up")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        warnings.simplefilter("ignore")
+        print(json.dumps(measure(args.sessions, args.steps, args.seed, args.cold)))
+        return
+
+    modes = list(MODES) if args.mode == "both" else [args.mode]
+    options = ["--sessions", str(args.sessions), "--steps", str(args.steps), "--seed", str(args.seed)]
+    results = {mode: run_child(mode, *options, *(["--cold"] if args.cold else [])) for mode in modes}
+    print(report(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if any(result["errors"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# Process-wide memoization for the app.
+# Every entry is keyed by a content hash of the source files (CSV + GeoJSON), so a data
+# refresh invalidates everything built from the old files while reruns and concurrent
+# sessions keep reusing the same DataFrames and figure objects.
+# The caches share a memory budget (APP_MEMORY_BUDGET_MB, split between the tiers by
+# BUDGET_SHARES): least recently used entries are evicted once a tier holds more than its share.
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import wraps
+
+from telemetry import measure
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = os.path.join(BASE_DIR, "unp_pro_df.csv")
+GEOJSON_PATH = os.path.join(BASE_DIR, "indonesia.geojson")
+# Optional regency tier (see regency.py)
+REGENCY_DATA_PATH = os.path.join(BASE_DIR, "unp_reg_df.csv")
+REGENCY_GEOJSON_PATH = os.path.join(BASE_DIR, "regencies.geojson")
+SOURCE_PATHS = (DATA_PATH, GEOJSON_PATH) + tuple(path for path in (REGENCY_DATA_PATH, REGENCY_GEOJSON_PATH)
+                                                 if os.path.exists(path))
+MEMORY_BUDGET_MB = float(os.environ.get("APP_MEMORY_BUDGET_MB", 512))
+BUDGET_SHARES = {"data": 0.25, "slices": 0.25, "figures": 0.5}
+
+_hash_lock = threading.Lock()
+_file_hashes = {}
+
+
+# SHA-256 of a file, recomputed only when its size or mtime changes
+def file_hash(path):
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        cached = _file_hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _hash_lock:
+        _file_hashes[path] = (signature, value)
+    return value
+
+
+# Combined hash of all source files, used as the version part of every cache key
+def source_key(paths=SOURCE_PATHS):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(file_hash(path).encode())
+    return digest.hexdigest()[:16]
+
+
+# Approximate memory held by nested dicts, lists and tuples, not counting objects in `skip`
+def deep_size(value, skip=()):
+    seen = set(map(id, skip))
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return total
+
+
+# Estimated bytes of a cached value: pandas' deep memory usage, nbytes when the value reports
+# it (arrays, Dataset, SharedSpec), the spec of a plotly figure, or the nested containers
+def sizeof(value):
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if hasattr(value, "to_plotly_json"):
+        return deep_size(value.to_dict())
+    return deep_size(value)
+
+
+class MemoCache:
+    # Thread-safe LRU cache. Keys are (source_key, name, args); entries whose source key
+    # no longer matches the files on disk are dropped on the next lookup. The cache holds at
+    # most maxsize entries and, when maxbytes is set, about maxbytes of estimated memory.
+    # The lock only guards the bookkeeping: builders run outside it, so a slow build never
+    # delays hits or builds of other entries.
+    def __init__(self, name, maxsize=128, maxbytes=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        # Futures of the entries being built, by key
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._source_key = None
+
+    def get_or_build(self, name, builder, *args):
+        version = source_key()
+        key = (version, name, args)
+        with self._lock:
+            if version != self._source_key:
+                self.invalidate(keep=version)
+                self._source_key = version
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            # One build per key: concurrent lookups of the same entry wait for the first one,
+            # lookups of other entries are not blocked by it
+            pending = self._pending.get(key)
+            building = pending is None
+            if building:
+                self.misses += 1
+                pending = self._pending[key] = Future()
+            else:
+                self.hits += 1
+        if not building:
+            return pending.result()
+        try:
+            with measure(self.name):
+                value = builder(*args)
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            pending.set_exception(exc)
+            raise
+        size = sizeof(value) if self.maxbytes is not None else 0
+        with self._lock:
+            del self._pending[key]
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            # The newest entry is always kept, even when it alone exceeds the budget
+            while len(self._entries) > 1 and (len(self._entries) > self.maxsize or
+                                              (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        pending.set_result(value)
+        return value
+
+    def _remove(self, key):
+        del self._entries[key]
+        self.nbytes -= self._sizes.pop(key)
+
+    # Drop entries by name, or every entry built from a different source key than `keep`
+    def invalidate(self, name=None, keep=None):
+        with self._lock:
+            for key in list(self._entries):
+                if (name is not None and key[1] == name) or (name is None and key[0] != keep):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.hits = self.misses = self.evictions = self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"cache": self.name, "entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "mb": round(self.nbytes / 2**20, 2)}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _budget(name):
+    return int(MEMORY_BUDGET_MB * BUDGET_SHARES[name] * 2**20)
+
+
+# One cache per tier: parsed sources (DataFrames, geometry), derived slices, finished figures
+data_cache = MemoCache("data", maxsize=16, maxbytes=_budget("data"))
+slice_cache = MemoCache("slices", maxsize=64, maxbytes=_budget("slices"))
+figure_cache = MemoCache("figures", maxsize=128, maxbytes=_budget("figures"))
+CACHES = (data_cache, slice_cache, figure_cache)
+
+
+# Decorator: memoize a function in the given cache under its qualified name
+def memoize(cache):
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args):
+            return cache.get_or_build(name, func, *args)
+        return wrapper
+    return decorator
+
+
+def clear_all():
+    for cache in CACHES:
+        cache.clear()
@@ -0,0 +1,408 @@
+# Figure builders for every chart in main.py.
+# Each builder is a pure function of the dataset, the geometry and the filter inputs it
+# declares, registered in CHARTS under the name main.py uses. CHART_INPUTS is the dependency
+# graph between the sidebar filters and the charts: the inputs declared with @chart(...) are the
+# only edges. cached_figure() keys the finished figure by the source hash and the values of
+# those inputs only, so a filter change invalidates exactly the charts that depend on it
+# (changing the year rebuilds just the per-year charts) and every other figure is reused. The
+# specs written by prebuild.py are used for the default inputs when they are up to date.
+# plotly.express takes about 0.2s and 6 MB to import and is only needed to build a figure, so
+# the builders that use it import it themselves.
+import plotly.graph_objects as go
+# Importing streamlit makes its plotly template the default, so figures built outside the app
+# (prebuild.py, benchmarks) carry the same template as the ones built in it. prebuild.py
+# records the Streamlit version with the prebuilt specs.
+import streamlit  # noqa: F401
+from plotly.subplots import make_subplots
+
+import compact
+import data
+import frames
+import metrics
+import prebuild
+import regency
+import shared
+from cache import figure_cache, memoize, slice_cache
+from geometry import FEATURE_ID_KEY, MAP_ZOOM, geometry_for_zoom
+
+CHARTS = {}
+# Chart -> the filter inputs it depends on (the dependency graph, see above)
+CHART_INPUTS = {}
+DEFAULT_INPUTS = {'year': data.LATEST_YEAR, 'provinces': None, 'indicator': 'GDI', 'province': None}
+# Page sections of main.py and the charts each one shows
+SECTIONS = {
+    'HDI/GDI': ['hdi_gdi', 'gdi_map', 'gdi_bar'],
+    'LE scatter': ['le_scatter'],
+    'Schooling': ['schooling_bar', 'asy_gap_line', 'asy_diff_bar'],
+    'EPC': ['epc_line', 'epc_scatter'],
+    'GEM': ['gem_line', 'gem_map', 'gem_bar'],
+    'SI': ['si_bar', 'si_province_bar'],
+    'IP': ['ip_bar', 'ip_province_bar'],
+    'PP': ['pp_bar', 'pp_province_bar'],
+    'Explore': ['indicator_bar'],
+}
+
+
+def chart(name, *inputs):
+    def decorator(func):
+        CHARTS[name] = func
+        CHART_INPUTS[name] = inputs
+        return func
+    return decorator
+
+
+# Figure of a chart as held by the figure cache: a read-only shared.SharedSpec, or a go.Figure
+# when shared state is off. Render it with shared.plotly_chart().
+def cached_figure(name, inputs=None):
+    inputs = {**DEFAULT_INPUTS, **(inputs or {})}
+    return figure_cache.get_or_build(name, _load_or_build, name, *(inputs[key] for key in CHART_INPUTS[name]))
+
+
+def get_figure(name, inputs=None):
+    return shared.to_figure(cached_figure(name, inputs))
+
+
+# Use the spec written by prebuild.py when it matches the current data and default inputs
+def _load_or_build(name, *args):
+    fig = None
+    if args == tuple(DEFAULT_INPUTS[key] for key in CHART_INPUTS[name]):
+        fig = prebuild.load_prebuilt(name)
+    return fig if fig is not None else shared.figure(compact.compact_json(CHARTS[name](*args)))
+
+
+def _province_map(column, range_color, title, provinces=None):
+    geometry = geometry_for_zoom(MAP_ZOOM)
+    fig = frames.single_trace_animation(data.selection(provinces), {'z': column}, {
+        'type': 'choroplethmapbox', 'geojson': geometry.geojson, 'featureidkey': FEATURE_ID_KEY,
+        'coloraxis': 'coloraxis', 'subplot': 'mapbox', 'name': '',
+        'hovertemplate': '<b>%{hovertext}</b><br><br>' + column + '=%{z}<extra></extra>'})
+    fig.update_layout(coloraxis={'cmin': range_color[0], 'cmax': range_color[1], 'colorscale': 'rdbu', 'colorbar_title_text': column},
+                        mapbox={'style': "carto-positron", 'zoom': MAP_ZOOM, 'center': geometry.center, 'domain': {'x': [0.0, 1.0], 'y': [0.0, 1.0]}},
+                        height=600, width=1000, legend_tracegroupgap=0)
+    fig.update_layout(margin={"l":0,"r":0,"t":60,"b":0}, paper_bgcolor='honeydew', font_color='black',
+                        title=title)
+    return fig
+
+
+# "National Average" label inside the national bar of a bar chart sorted by column (descending)
+def _national_average(fig, column, year=data.LATEST_YEAR, provinces=None):
+    x, value = metrics.national_position(column, year, provinces)
+    fig.add_annotation(xref="x", yref="y", x=x, y=value / 2, font_color='black', text="National Average",
+                    showarrow=False, textangle=-90)
+
+
+# Bubble traces of every province, built once per source ('data' or 'metrics') and columns
+@memoize(slice_cache)
+def _bubble_tracks(source, x, y, hovertemplate):
+    dataset = data.load_dataset() if source == 'data' else metrics.load_metrics()
+    return frames.grouped_tracks(dataset.provinces, {'x': x, 'y': y, 'marker.size': 'Population'}, {
+        'type': 'scatter', 'mode': 'markers', 'orientation': 'v', 'xaxis': 'x', 'yaxis': 'y',
+        'hovertemplate': hovertemplate,
+        'marker': {'sizemode': 'area', 'sizeref': 80000, 'sizemin': 5, 'symbol': 'circle', 'opacity': 0.5,
+                   'line': {'color': 'black', 'width': 0.5}}}, colors=data.province_colors())
+
+
+# Animated bubble chart of two columns with population-sized markers, one trace per province.
+# A province selection only picks cached traces, none is rebuilt.
+def _province_bubbles(source, x, y, hovertemplate, provinces=None):
+    labels, tracks = _bubble_tracks(source, x, y, hovertemplate)
+    names = [name for name in tracks if provinces is None or name in provinces]
+    return frames.assemble_tracks(labels, [tracks[name] for name in names])
+
+
+@chart('hdi_gdi')
+def hdi_gdi_chart():
+    national = data.load_dataset().national
+    # Create figure with secondary y-axis
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    # Add traces
+    fig.add_trace(
+        go.Bar(x=national['Year'], y=national['MaleHDI'], name="Male HDI", marker_color='dodgerblue', text=national['MaleHDI'], textposition='inside',hovertemplate ='%{y:.2f}'),
+        secondary_y=False,
+    )
+    fig.add_trace(
+        go.Bar(x=national['Year'], y=national['FemaleHDI'], name="Female HDI", marker_color='indianred', text=national['FemaleHDI'],textposition='inside', hovertemplate ='%{y:.2f}'),
+        secondary_y=False,
+    )
+    fig.add_trace(
+        go.Scatter(x=national['Year'], y=national['GDI'], name="GDI", marker_color='limegreen',),
+        secondary_y=True,
+    )
+
+    # Set x-axis title
+    fig.update_xaxes(title_text="Year")
+    # Set y-axes titles
+    fig.update_yaxes(title_text="Gender Development Index", secondary_y=True)
+    fig.update_yaxes(title_text="Human Development Index", secondary_y=False)
+
+    fig.update_traces(marker_line_color='black')
+    fig.update_layout(barmode='group', height=500, width=900, hovermode='x unified',paper_bgcolor='honeydew',
+        plot_bgcolor='lavender', font_color='black',
+        title="<b>Male & Female Human Development Index and Gender Development Index in Indonesia (2010-2021)</b>")
+    return fig
+
+
+@chart('gdi_map', 'provinces')
+def gdi_map_chart(provinces=None):
+    return _province_map('GDI', (75,95), '<b>Gender Development Index by Province (2010-2021)</b>', provinces)
+
+
+@chart('gdi_bar', 'year', 'provinces')
+def gdi_bar_chart(year=data.LATEST_YEAR, provinces=None):
+    import plotly.express as px
+    fig = px.bar(data.snapshot(year, provinces).sort_values('GDI', ascending=False, kind='stable'), x='Province', y='GDI',
+                orientation='v', title = f"<b>Gender Development Index by Province ({year})</b>",height=600, width=800,
+                color='GDI', color_continuous_scale='rdbu', range_color=(75,95),hover_name='Province', hover_data={'Province': False},)
+    fig.update_traces(marker_line_color='black')
+    _national_average(fig, 'GDI', year, provinces)
+    fig.update_layout(xaxis_tickangle=-90, paper_bgcolor='honeydew', plot_bgcolor='#e6e6e6', font_color='black',yaxis_title='Gender Development Index')
+    return fig
+
+
+@chart('le_scatter', 'provinces')
+def le_scatter_chart(provinces=None):
+    fig = _province_bubbles('data', 'MaleLE', 'FemaleLE', '<b>%{hovertext}</b><br><br>Male LE=%{x}<br>Female LE=%{y}<extra></extra>', provinces)
+    fig.update_layout(xaxis_range=[60.5,75], yaxis_range=[60.5,77.5], height = 600, width = 700, title='<b>Female vs Male Life Expectancy by Province (2010-2021)</b><br>Bubble size based on population', legend={'itemsizing': 'constant', 'title_text': 'Province', 'tracegroupgap': 0})
+    fig.update_layout(shapes = [{'type': 'line', 'yref': 'y', 'xref': 'x', 'y0': 1, 'y1': 100, 'x0': 1, 'x1':100, 'line_color':'lightgray', 'line_dash':'dot'}],paper_bgcolor='honeydew', plot_bgcolor='lavender', font_color='black',xaxis_title='Male Life Expectancy (Years)', yaxis_title='Female Life Expectancy (Years)')
+    return fig
+
+
+@chart('schooling_bar')
+def schooling_bar_chart():
+    national = data.load_dataset().national
+    fig = make_subplots(rows=2,cols=1, subplot_titles=('<b>Expected Schooling Years in Indonesia (2010-2021)</b>', '<b>Average Schooling Years in Indonesia (2010-2021)</b>'), vertical_spacing=0.15)
+    fig.add_trace(
+        go.Bar(
+                name="Female",
+                x=national['Year'],
+                y=national['FemaleESY'],
+                offsetgroup=0,
+                marker_color="indianred",
+                legendgroup='group1',
+                text = national['FemaleESY'],
+                hovertemplate = '%{y:.2f}'),
+                row = 1, col = 1)
+    fig.add_trace(
+        go.Bar(
+                name="Male",
+                x=national['Year'],
+                y=national['MaleESY'],
+                offsetgroup=1,
+                marker_color="dodgerblue",
+                legendgroup='group2',
+                text = national['MaleESY'],
+                hovertemplate = '%{y:.2f}'),
+                row = 1, col =1)
+    fig.add_trace(
+        go.Bar(
+                name="Female",
+                x=national['Year'],
+                y=national['FemaleASY'],
+                offsetgroup=0,
+                marker_color="indianred",
+                showlegend=False,
+                legendgroup='group1',
+                text = national['FemaleASY'],
+                hovertemplate = '%{y:.2f}'),
+                row = 2, col = 1)
+    fig.add_trace(
+        go.Bar(
+                name="Male",
+                x=national['Year'],
+                y=national['MaleASY'],
+                offsetgroup=1,
+                marker_color="dodgerblue",
+                showlegend=False,
+                legendgroup='group2',
+                text = national['MaleESY'],
+                hovertemplate = '%{y:.2f}'),
+                row = 2, col = 1)
+    fig.update_traces(marker_line_color='black')
+    fig.update_layout(hovermode="x unified", yaxis_title="Expected Scooling Years", xaxis_title='Year', yaxis2_title = 'Average Schooling Years', xaxis2_title = 'Year', paper_bgcolor='honeydew', plot_bgcolor='lavender', font_color='black', height=700, margin={"t":50,"b":50})
+    fig.layout.annotations[0].update(x=0.22)
+    fig.layout.annotations[1].update(x=0.22)
+    return fig
+
+
+@chart('asy_gap_line')
+def asy_gap_line_chart():
+    import plotly.express as px
+    national = metrics.load_metrics().national
+    fig = px.line(national, x='Year', y=national['ASY_gap'].rename(None), height=600, title='<b>Difference Between Male and Female Average Schooling Years in Indonesia (2010-2021)</b>',)
+    fig.update_layout(
+        yaxis_title="Difference in Years (Male ASY - Female ASY)",paper_bgcolor='honeydew', plot_bgcolor='lavender', font_color='black')
+    fig.update_traces(line_color='limegreen')
+    fig.data[0].hovertemplate = '%{x}<br>Difference in Years=%{y} <extra></extra>'
+    return fig
+
+
+@chart('asy_diff_bar', 'year', 'provinces')
+def asy_diff_bar_chart(year=data.LATEST_YEAR, provinces=None):
+    import plotly.express as px
+    fig = px.bar(metrics.snapshot(year, provinces).sort_values('ASY_gap', ascending=False), x='ASY_gap', y='Province', title = f"<b>Difference Between Male and Female Average Schooling Years by Province ({year})</b>",height=800, width=1000, color='ASY_gap', color_continuous_scale='darkmint', labels={'ASY_gap':'Difference in Years'}, hover_name='Province', hover_data={"Province":False, 'ASY_gap':':.2f'})
+    fig.update_traces(marker_line_color='black')
+    fig.update_layout(xaxis_title="Difference in Years (Male ASY - Female ASY)",paper_bgcolor='honeydew', plot_bgcolor='lavender', font_color='black')
+    fig.add_vline(x=0, line_width=3, line_dash="dash", line_color="black")
+    return fig
+
+
+@chart('epc_line')
+def epc_line_chart():
+    import plotly.express as px
+    fig = px.line(metrics.load_metrics().national, x='Year', y=['MaleEPC','FemaleEPC'], width=600, height=500, title='<b>Male & Female Expenditure per Capita in Indonesia (2010-2021)</b>', labels={'variable':'Gender'},)
+    fig.data[0].hovertemplate = 'Male EPC=%{y:.2f}M<extra></extra>'
+    fig.data[1].hovertemplate = 'Female EPC=%{y:.2f}M<extra></extra>'
+    fig.update_layout(yaxis={'range':[6,18]},
+        hovermode='x unified',
+        yaxis_title="Expenditure Per Capita in Million IDR",paper_bgcolor='honeydew', plot_bgcolor='lavender', font_color='black',
+        xaxis_tickangle=-45)
+    for idx, name in enumerate(['Male','Female']):
+        fig.data[idx].name = name
+    return fig
+
+
+@chart('epc_scatter', 'provinces')
+def epc_scatter_chart(provinces=None):
+    fig = _province_bubbles('metrics', 'MaleEPC', 'FemaleEPC', '<b>%{hovertext}</b><br><br>Male EPC=%{x:.2f}M<br>Female EPC=%{y:.2f}M<extra></extra>', provinces)
+    fig.update_layout(xaxis_range=[2.8,24], yaxis_range=[2.8,22], height = 600, width = 850, title='<b>Female vs Male Expenditure per Capita by Province (2010-2021)</b><br>Bubble size based on population', legend={'itemsizing': 'constant', 'title_text': 'Province', 'tracegroupgap': 0})
+    fig.update_layout(shapes = [{'type': 'line', 'yref': 'y', 'xref': 'x', 'y0': 1, 'y1': 24, 'x0': 1, 'x1': 24, 'line_color':'lightgray', 'line_dash':'dot'}], xaxis_title = 'Male Expenditure Per Capita in Million IDR', yaxis_title = 'Female Expenditure Per Capita in Million IDR', paper_bgcolor='honeydew', plot_bgcolor='lavender', font_color='black',)
+    return fig
+
+
+@chart('gem_line')
+def gem_line_chart():
+    import plotly.express as px
+    fig = px.line(data.load_dataset().national, x='Year', y='GEM', color="Province", color_discrete_map=data.province_colors(), title='<b>Gender Empowerment Measure in Indonesia (2010-2021)</b>', hover_data={'Province':False})
+    fig.update_layout(height = 500, paper_bgcolor='honeydew',
+        plot_bgcolor='lavender', font_color='black',)
+    fig.update_traces(line_color='limegreen')
+    fig.update_layout(showlegend=False,yaxis_title='Gender Empowerment Measure')
+    return fig
+
+
+@chart('gem_map', 'provinces')
+def gem_map_chart(provinces=None):
+    return _province_map('GEM', (50,85), '<b>Gender Empowerment Measure by Province (2010-2021)</b>', provinces)
+
+
+@chart('gem_bar', 'year', 'provinces')
+def gem_bar_chart(year=data.LATEST_YEAR, provinces=None):
+    import plotly.express as px
+    fig = px.bar(data.snapshot(year, provinces).sort_values('GEM', ascending=False, kind='stable'), x='Province', y='GEM',
+                orientation='v', title = f"<b>Gender Empowerment Measure by Province ({year})</b>",height=600, width=800,
+                range_color=(50,85), color="GEM", color_continuous_scale='rdbu', hover_name='Province', hover_data={'Province': False})
+    _national_average(fig, 'GEM', year, provinces)
+    fig.update_layout(xaxis_tickangle=-90, paper_bgcolor='honeydew', plot_bgcolor='#e6e6e6', font_color='black',yaxis_title='Gender Empowerment Measure')
+    fig.update_traces(marker_line_color='black')
+    return fig
+
+
+# Stacked female/male share over the years (SI, IP, PP)
+def _share_bar(indicator, title, label):
+    import plotly.express as px
+    female, male = 'Female' + indicator, 'Male' + indicator
+    fig = px.bar(data.load_dataset().national, x='Year', y=[female,male],orientation='v', barmode='stack', title = title,height=600, width=900, color_discrete_map={male:'dodgerblue', female:'indianred'}, labels={'variable':'Gender', 'value':label}, text_auto=True)
+    fig.update_layout(hovermode='x unified', paper_bgcolor='honeydew', plot_bgcolor='lavender', font_color='black',margin={"l":100,})
+    fig.update_traces(marker_line_color='black', hovertemplate=None)
+    fig.layout.yaxis.tickformat = ',.0%'
+    for idx, name in enumerate(['Female','Male']):
+        fig.data[idx].name = name
+    return fig
+
+
+# Female share by province in one year (SI, IP, PP)
+def _share_province_bar(indicator, title, short_label, yaxis_title, year=data.LATEST_YEAR, provinces=None):
+    import plotly.express as px
+    female = 'Female' + indicator
+    fig = px.bar(data.snapshot(year, provinces).sort_values(female, ascending=False, kind='stable'), x='Province', y=female,
+                orientation='v', title = title,height=600, width=800,
+                color=female, color_continuous_scale='rdbu', hover_name='Province', hover_data={'Province': False, female:':,.1%'},labels={female:short_label})
+    _national_average(fig, female, year, provinces)
+    fig.update_layout(xaxis_tickangle=-90, paper_bgcolor='honeydew', plot_bgcolor='#e6e6e6', font_color='black',margin={"l":100,}, yaxis_title=yaxis_title)
+    fig.layout.yaxis.tickformat = ',.0%'
+    fig.update_coloraxes(colorbar_tickformat=',.0%')
+    fig.update_traces(marker_line_color='black',)
+    return fig
+
+
+@chart('si_bar')
+def si_bar_chart():
+    return _share_bar('SI', "<b>Male and Female Share of Income in Indonesia (2010-2021)</b>", 'Share of Income (%)')
+
+
+@chart('si_province_bar', 'year', 'provinces')
+def si_province_bar_chart(year=data.LATEST_YEAR, provinces=None):
+    return _share_province_bar('SI', f"<b>Female Share of Income by Province ({year})</b>", 'FSI', 'Female Share of Income', year, provinces)
+
+
+@chart('ip_bar')
+def ip_bar_chart():
+    return _share_bar('IP', "<b>Male and Female Involvement in Parliament in Indonesia (2010-2021)</b>", 'Involvement in Parliament (%)')
+
+
+@chart('ip_province_bar', 'year', 'provinces')
+def ip_province_bar_chart(year=data.LATEST_YEAR, provinces=None):
+    return _share_province_bar('IP', f"<b>Female Involvement in Parliament by Province ({year})</b>", 'FIP', 'Female Involvement in Parliament', year, provinces)
+
+
+@chart('pp_bar')
+def pp_bar_chart():
+    return _share_bar('PP', "<b>Male and Female Involvement in Professional Position in Indonesia (2010-2021)</b>", 'Involvement in Professional Position (%)')
+
+
+@chart('pp_province_bar', 'year', 'provinces')
+def pp_province_bar_chart(year=data.LATEST_YEAR, provinces=None):
+    return _share_province_bar('PP', f"<b>Female Involvement in Professional Position by Province ({year})</b>", 'FPP', 'Female in Professional Position', year, provinces)
+
+
+@chart('indicator_bar', 'year', 'provinces', 'indicator')
+def indicator_bar_chart(year=data.LATEST_YEAR, provinces=None, indicator='GDI'):
+    import plotly.express as px
+    label = metrics.CHOICES[indicator]
+    fig = px.bar(metrics.snapshot(year, provinces).sort_values(indicator, ascending=False, kind='stable'), x='Province', y=indicator,
+                orientation='v', title = f"<b>{label} by Province ({year})</b>",height=600, width=800,
+                color=indicator, color_continuous_scale='rdbu', hover_name='Province', hover_data={'Province': False, indicator:':.4~f'}, labels={indicator: label})
+    _national_average(fig, indicator, year, provinces)
+    fig.update_layout(xaxis_tickangle=-90, paper_bgcolor='honeydew', plot_bgcolor='#e6e6e6', font_color='black', yaxis_title=label, coloraxis_colorbar_title_text='')
+    fig.update_traces(marker_line_color='black')
+    return fig
+
+
+# Regency drilldown: one province's regencies at a time (province None = the first one). Every
+# province shares the year's color range, so maps of different provinces can be compared.
+def regency_map_chart(year=data.LATEST_YEAR, province=None, indicator='GDI'):
+    province = province or regency.provinces()[0]
+    rows = regency.drilldown(province, year)
+    geometry = regency.load_regency_geometry(province)
+    label = metrics.CHOICES[indicator]
+    low, high = regency.value_range(indicator, year)
+    fig = go.Figure(go.Choroplethmapbox(geojson=geometry.geojson, featureidkey=regency.REGENCY_ID_KEY,
+                    locations=rows['Regency'].astype(str), z=rows[indicator], zmin=low, zmax=high, colorscale='rdbu',
+                    marker_line_width=0.5, colorbar_title_text='', name='',
+                    hovertemplate='<b>%{location}</b><br><br>' + label + '=%{z:.4~f}<extra></extra>'))
+    fig.update_layout(mapbox={'style': "carto-positron", 'zoom': geometry.zoom, 'center': geometry.center},
+                        height=600, width=1000, margin={"l":0,"r":0,"t":60,"b":0}, paper_bgcolor='honeydew', font_color='black',
+                        title=f"<b>{label} by Regency, {province} ({year})</b>")
+    return fig
+
+
+def regency_bar_chart(year=data.LATEST_YEAR, province=None, indicator='GDI'):
+    import plotly.express as px
+    province = province or regency.provinces()[0]
+    label = metrics.CHOICES[indicator]
+    fig = px.bar(regency.drilldown(province, year).sort_values(indicator, ascending=False, kind='stable'), x='Regency', y=indicator,
+                orientation='v', title = f"<b>{label} by Regency, {province} ({year})</b>",height=600, width=800,
+                color=indicator, color_continuous_scale='rdbu', range_color=regency.value_range(indicator, year),
+                hover_name='Regency', hover_data={'Regency': False, indicator:':.4~f'}, labels={indicator: label})
+    fig.add_hline(y=regency.province_value(province, year, indicator), line_dash='dash', line_color='black',
+                  annotation_text="Province (population-weighted)", annotation_position='top right')
+    fig.update_layout(xaxis_tickangle=-90, paper_bgcolor='honeydew', plot_bgcolor='#e6e6e6', font_color='black', yaxis_title=label, coloraxis_colorbar_title_text='')
+    fig.update_traces(marker_line_color='black')
+    return fig
+
+
+# Registered only when the regency files are present
+if regency.available():
+    chart('regency_map', 'year', 'province', 'indicator')(regency_map_chart)
+    chart('regency_bar', 'year', 'province', 'indicator')(regency_bar_chart)
+    SECTIONS['Regencies'] = ['regency_map', 'regency_bar']
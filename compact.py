@@ -0,0 +1,160 @@
+# Compaction of figures before they are sent to the browser.
+# Numbers are rounded to the precision they are displayed at: an attribute the hovertemplate
+# formats with fixed decimals (%{y:.2f}, %{x:,.1%}) is rounded to those decimals, everything
+# else to 12 significant digits, which drops float noise such as 0.31670000000000004 but keeps
+# every digit of the data. Arrays that repeat another attribute are replaced by a reference to
+# it, attributes equal to the plotly.js defaults are dropped and long numeric arrays are sent
+# as base64 typed arrays when that is shorter than their JSON. Frames keep plain lists:
+# plotly.py validates frame data even when the figure itself is not validated.
+#
+#   python compact.py          # bytes per chart before and after compaction
+import argparse
+import base64
+import json
+import re
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# The data has at most 9 significant digits (Population, expenditure per capita); 12 also keeps
+# the derived ratios and gaps well past what any chart shows
+SIGNIFICANT_DIGITS = 12
+# Hovertemplate fields with a fixed number of decimals: %{y:.2f}, %{z:.4~f}, %{y:,.1%}
+FORMATTED = re.compile(r"%\{(x|y|z):[^}]*?\.(\d+)~?([f%])\}")
+# Trace attributes that plotly.js decodes from {'dtype', 'bdata'} typed array specs
+TYPED_PATHS = {("x",), ("y",), ("z",), ("customdata",), ("marker", "size"), ("marker", "color")}
+TYPED_MIN_LENGTH = 8
+INT_DTYPES = ("i1", "u1", "i2", "u2", "i4", "u4")
+# Trace attributes plotly express sets to the plotly.js defaults
+TRACE_DEFAULTS = {"legendgroup": "", "offsetgroup": "", "xaxis": "x", "yaxis": "y"}
+# Attributes whose values are not data (the geometry is already quantized by geometry.py)
+SKIP_KEYS = {"geojson"}
+
+
+# Round every float, or to `decimals` places when given
+def _round(value, decimals=None):
+    if isinstance(value, float):
+        if decimals is not None:
+            value = round(value, decimals)
+        if value.is_integer():
+            return int(value)
+        return float(f"{value:.{SIGNIFICANT_DIGITS}g}")
+    if isinstance(value, list):
+        return [_round(item, decimals) for item in value]
+    if isinstance(value, dict):
+        return {key: item if key in SKIP_KEYS else _round(item) for key, item in value.items()}
+    return value
+
+
+# Decimals each attribute is shown with in a trace's hovertemplate (a percentage shows two
+# more decimals of the value)
+def _display_decimals(trace):
+    template = trace.get("hovertemplate")
+    if not isinstance(template, str):
+        return {}
+    return {attribute: int(decimals) + (2 if kind == "%" else 0)
+            for attribute, decimals, kind in FORMATTED.findall(template)}
+
+
+def _numeric(values):
+    return (isinstance(values, list) and len(values) >= TYPED_MIN_LENGTH
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values))
+
+
+# Base64 typed array spec, or the list itself when its JSON is shorter
+def _typed(values):
+    dtype = "f8"
+    if all(isinstance(v, int) for v in values):
+        dtype = next((d for d in INT_DTYPES if np.iinfo(d).min <= min(values) and max(values) <= np.iinfo(d).max), dtype)
+    spec = {"dtype": dtype, "bdata": base64.b64encode(np.asarray(values, dtype=dtype).tobytes()).decode()}
+    return spec if len(json.dumps(spec)) < len(json.dumps(values)) else values
+
+
+def _compact_trace(trace, typed=True, decimals=None):
+    decimals = decimals if decimals is not None else _display_decimals(trace)
+    trace = {key: _round(value, decimals.get(key)) if key in decimals else _round(value) for key, value in trace.items()}
+    for key, default in TRACE_DEFAULTS.items():
+        if trace.get(key) == default:
+            del trace[key]
+    if trace.get("marker", {}).get("pattern") == {"shape": ""}:
+        del trace["marker"]["pattern"]
+
+    # Bar labels that repeat the bar values
+    for axis in ("y", "x"):
+        if "text" in trace and "texttemplate" not in trace and trace["text"] == trace.get(axis):
+            del trace["text"]
+            trace["texttemplate"] = "%{" + axis + "}"
+    # Hover names that repeat the categories or the map locations
+    template = trace.get("hovertemplate")
+    if "hovertext" in trace and isinstance(template, str) and "%{hovertext}" in template:
+        for key, variable in (("x", "x"), ("y", "y"), ("locations", "location")):
+            if trace["hovertext"] == trace.get(key) and len(trace["hovertext"]) > 1:
+                del trace["hovertext"]
+                trace["hovertemplate"] = template.replace("%{hovertext}", "%{" + variable + "}")
+                break
+
+    for path in TYPED_PATHS if typed else ():
+        *parents, leaf = path
+        node = trace
+        for parent in parents:
+            node = node.get(parent) if isinstance(node, dict) else None
+        if isinstance(node, dict) and _numeric(node.get(leaf)):
+            node[leaf] = _typed(node[leaf])
+    return trace
+
+
+def compact_spec(spec):
+    spec = dict(spec)
+    decimals = [_display_decimals(trace) for trace in spec.get("data", [])]
+    spec["data"] = [_compact_trace(trace) for trace in spec.get("data", [])]
+    if spec.get("frames"):
+        spec["frames"] = [{**frame, "data": [_compact_trace(trace, False, _frame_decimals(frame, i, trace, decimals))
+                                             for i, trace in enumerate(frame.get("data", []))]}
+                          for frame in spec["frames"]]
+    return spec
+
+
+# Frame traces update the figure traces listed in frame["traces"] (by default the first ones)
+# and are shown with their hovertemplate unless they bring their own
+def _frame_decimals(frame, index, trace, decimals):
+    if "hovertemplate" in trace:
+        return None
+    target = frame["traces"][index] if "traces" in frame else index
+    return decimals[target] if target < len(decimals) else {}
+
+
+# Compacted spec of a figure, as plain JSON types
+def compact_json(fig):
+    return compact_spec(json.loads(pio.to_json(fig, validate=False)))
+
+
+# Compacted copy of a figure; the result holds typed array specs, so it is not re-validated
+def compact_figure(fig):
+    return go.Figure(compact_json(fig), _validate=False)
+
+
+def size(fig):
+    return len(pio.to_json(fig, validate=False).encode())
+
+
+def report():
+    import charts
+    rows = []
+    for name, builder in charts.CHARTS.items():
+        fig = builder()
+        rows.append({"chart": name, "before": size(fig), "after": size(compact_figure(fig))})
+    return rows
+
+
+def main():
+    argparse.ArgumentParser(description="Report the figure JSON size of every chart before and after compaction.").parse_args()
+    rows = report()
+    for row in rows:
+        print(f"{row['chart']:>16}  {row['before']:>8} -> {row['after']:>8} bytes ({row['after'] / row['before']:.0%})")
+    before, after = sum(row["before"] for row in rows), sum(row["after"] for row in rows)
+    print(f"{'total':>16}  {before:>8} -> {after:>8} bytes ({after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# Loading and slicing of the province dataset (unp_pro_df.csv).
+import itertools
+import os
+import sys
+
+import pandas as pd
+from plotly.colors import qualitative
+
+import shared
+from cache import DATA_PATH, data_cache, file_hash, memoize, slice_cache
+
+# Every DataFrame loaded here is shared by all sessions (see shared.py). With copy-on-write,
+# a session modifying a slice gets its own copy instead of writing through to the shared frame.
+# The option is process-wide: it applies to Streamlit's and every other library's pandas use
+# too (documented with APP_SHARED_STATE in the README).
+if shared.ENABLED:
+    pd.set_option("mode.copy_on_write", True)
+
+NATIONAL = "Indonesia"
+LATEST_YEAR = 2021
+
+# Compact copy of the csv (Arrow IPC / Feather v2, uncompressed so it can be memory-mapped).
+# Written by `python etl.py`; used only while it was built from the current csv.
+ARROW_PATH = os.path.splitext(DATA_PATH)[0] + ".arrow"
+SOURCE_HASH_KEY = b"source_sha256"
+
+# Published precision (decimal places) of the bounded metrics
+DECIMALS = dict.fromkeys(['GDI', 'GEM', 'FemaleLE', 'MaleLE', 'FemaleASY', 'MaleASY', 'FemaleESY', 'MaleESY',
+                          'FemaleHDI', 'MaleHDI'], 2)
+DECIMALS.update(dict.fromkeys(['FemaleSI', 'MaleSI', 'FemaleIP', 'MaleIP', 'FemaleMP', 'MaleMP',
+                               'FemalePP', 'MalePP'], 4))
+
+
+# Narrow the key columns: categorical Province, int16 Year. The metrics stay float64, so the
+# values read back are exactly the ones in the csv.
+def to_compact(df):
+    df = df.drop(columns=[c for c in df.columns if c.startswith('Unnamed')])
+    return df.astype({'Province': 'category', 'Year': 'int16'})
+
+
+def write_compact(df, path=ARROW_PATH, source_path=DATA_PATH):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    table = pa.Table.from_pandas(to_compact(df), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           SOURCE_HASH_KEY: file_hash(source_path).encode()})
+    feather.write_feather(table, path, compression='uncompressed')
+
+
+# Memory-mapped read of the Arrow file, or None when pyarrow is missing or the file is stale
+def read_compact(path=ARROW_PATH, source_path=DATA_PATH):
+    try:
+        import pyarrow.feather as feather
+    except ImportError:
+        return None
+    if not os.path.exists(path):
+        return None
+    table = feather.read_table(path, memory_map=True)
+    if (table.schema.metadata or {}).get(SOURCE_HASH_KEY) != file_hash(source_path).encode():
+        return None
+    return table.to_pandas(split_blocks=True)
+
+
+@memoize(data_cache)
+def load_data(path=DATA_PATH):
+    df = read_compact(source_path=path) if path == DATA_PATH else None
+    if df is None:
+        df = to_compact(pd.read_csv(path, index_col=0))
+    # For visualization purpose, the null value for Kalimantan Utara population (2010-2014) will be backward filled.
+    df['Population'] = df['Population'].bfill()
+    return df
+
+
+@memoize(data_cache)
+def province_colors():
+    color_list = qualitative.Dark24[:] + qualitative.Vivid[:]
+    # Cycle the palette when there are more provinces than colors (synthetic benchmark data)
+    return dict(zip(load_dataset().province_names, itertools.cycle(color_list)))
+
+
+class Dataset:
+    # Read-only access layer over the province dataset. The national/provincial split and the
+    # per-year snapshots are built once, so charts get dictionary lookups instead of
+    # re-parsing and re-scanning df.query(...) expressions.
+    def __init__(self, df):
+        self.frame = df
+        is_national = df['Province'] == NATIONAL
+        self.national = df[is_national]
+        self.provinces = df[~is_national]
+        self.years = dict(tuple(df.groupby('Year', sort=True)))
+        # Province names in order of first appearance (the order of the color palette)
+        self.province_names = list(dict.fromkeys(df['Province']))
+        self._positions = {key: pos for pos, key in enumerate(zip(df['Province'], df['Year']))}
+
+    def year(self, value):
+        return self.years[value]
+
+    def value(self, province, year, column):
+        return self.frame.iat[self._positions[(province, year)], self.frame.columns.get_loc(column)]
+
+    # Estimated memory of the frame and the snapshots built from it
+    @property
+    def nbytes(self):
+        frames = [self.frame, self.national, self.provinces, *self.years.values()]
+        return sum(int(frame.memory_usage(deep=True).sum()) for frame in frames) + sys.getsizeof(self._positions)
+
+
+@memoize(data_cache)
+def load_dataset():
+    return Dataset(load_data())
+
+
+# Filter inputs -> data slices. provinces is None (every province) or a sorted tuple of names;
+# the national row is always kept as the reference.
+def select(frame, provinces=None):
+    if provinces is None:
+        return frame
+    return frame[frame['Province'].isin((NATIONAL,) + tuple(provinces))]
+
+
+# Every year of the national row and the selected provinces
+@memoize(slice_cache)
+def selection(provinces=None):
+    return select(load_dataset().frame, provinces)
+
+
+# One year of the national row and the selected provinces
+@memoize(slice_cache)
+def snapshot(year=LATEST_YEAR, provinces=None):
+    return select(load_dataset().year(year), provinces)
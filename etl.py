@@ -0,0 +1,167 @@
+# Rebuild unp_pro_df.csv from the BPS workbooks in Excel Data/.
+# Workbooks are parsed in a process pool and each parsed table is cached next to a
+# content hash of the workbook and of this file (its WORKBOOKS scales, PROVINCES labels and
+# parser), so refreshing one workbook only re-parses that file before the join, and a change
+# to the parsing re-parses all of them.
+#
+#   python etl.py              # incremental rebuild
+#   python etl.py --force      # re-parse every workbook
+#   python etl.py --compact    # only rewrite unp_pro_df.arrow from the current csv
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cache import BASE_DIR, DATA_PATH, file_hash
+from data import ARROW_PATH, write_compact
+
+EXCEL_DIR = os.path.join(BASE_DIR, "Excel Data")
+CACHE_DIR = os.path.join(BASE_DIR, ".etl_cache")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+SHEET = "cleaned"
+
+# Column blocks of each workbook, left to right: (output column, scale factor).
+# Share indicators are published for female only; the male share is the complement.
+WORKBOOKS = {
+    "Population Data 2010-2021.xlsx": [("Population", 1000)],
+    "Gender Development Index.xlsx": [("GDI", 1)],
+    "Gender Empowerment Measure.xlsx": [("GEM", 1)],
+    "Life Expectancy by Gender.xlsx": [("FemaleLE", 1), ("MaleLE", 1)],
+    "Average Schooling Years by Gender.xlsx": [("FemaleASY", 1), ("MaleASY", 1)],
+    "Expected Schooling Years by Gender.xlsx": [("FemaleESY", 1), ("MaleESY", 1)],
+    "Expenditure per Capita by Gender.xlsx": [("FemaleEPC", 1000), ("MaleEPC", 1000)],
+    "Human Development Index by Gender.xlsx": [("FemaleHDI", 1), ("MaleHDI", 1)],
+    "Female Share of Income.xlsx": [("FemaleSI", 0.01)],
+    "Female Involvement in Parliament.xlsx": [("FemaleIP", 0.01)],
+    "Female in Managerial Position.xlsx": [("FemaleMP", 0.01)],
+    "Female in Professional Position.xlsx": [("FemalePP", 0.01)],
+}
+# Blank cells are published as 0 in these columns (e.g. Kalimantan Utara before it was formed)
+ZERO_IS_MISSING = {"FemaleEPC", "MaleEPC"}
+COMPLEMENTS = {"MaleSI": "FemaleSI", "MaleIP": "FemaleIP", "MaleMP": "FemaleMP", "MalePP": "FemalePP"}
+COLUMNS = ["Province", "Year", "Population", "GDI", "GEM", "FemaleLE", "MaleLE", "FemaleASY", "MaleASY",
+           "FemaleESY", "MaleESY", "FemaleEPC", "MaleEPC", "FemaleHDI", "MaleHDI", "FemaleSI", "MaleSI",
+           "FemaleIP", "MaleIP", "FemaleMP", "MaleMP", "FemalePP", "MalePP"]
+
+# BPS province labels (normalized: upper case, letters only) -> Province names used by the app
+# and the GeoJSON. Regency rows are skipped because their labels are not in this table.
+PROVINCES = {
+    "ACEH": "Aceh", "SUMATERAUTARA": "Sumatera Utara", "SUMATERABARAT": "Sumatera Barat", "RIAU": "Riau",
+    "JAMBI": "Jambi", "SUMATERASELATAN": "Sumatera Selatan", "BENGKULU": "Bengkulu", "LAMPUNG": "Lampung",
+    "KEPBANGKABELITUNG": "Bangka-Belitung", "KEPULAUANRIAU": "Kepulauan Riau", "KEPRIAU": "Kepulauan Riau",
+    "DKIJAKARTA": "Jakarta Raya", "JAWABARAT": "Jawa Barat", "JAWATENGAH": "Jawa Tengah",
+    "DIYOGYAKARTA": "Yogyakarta", "JAWATIMUR": "Jawa Timur", "BANTEN": "Banten", "BALI": "Bali",
+    "NUSATENGGARABARAT": "Nusa Tenggara Barat", "NUSATENGGARATIMUR": "Nusa Tenggara Timur",
+    "KALIMANTANBARAT": "Kalimantan Barat", "KALIMANTANTENGAH": "Kalimantan Tengah",
+    "KALIMANTANSELATAN": "Kalimantan Selatan", "KALIMANTANTIMUR": "Kalimantan Timur",
+    "KALIMANTANUTARA": "Kalimantan Utara", "SULAWESIUTARA": "Sulawesi Utara", "SULAWESITENGAH": "Sulawesi Tengah",
+    "SULAWESISELATAN": "Sulawesi Selatan", "SULAWESITENGGARA": "Sulawesi Tenggara", "GORONTALO": "Gorontalo",
+    "SULAWESIBARAT": "Sulawesi Barat", "MALUKU": "Maluku", "MALUKUUTARA": "Maluku Utara",
+    "PAPUABARAT": "Papua Barat", "PAPUA": "Papua", "INDONESIA": "Indonesia",
+}
+
+
+def _normalize(label):
+    return re.sub(r"[^A-Z]", "", str(label).upper())
+
+
+# Parse one workbook into a long (Province, Year) indexed frame
+def parse_workbook(filename):
+    blocks = WORKBOOKS[filename]
+    sheet = pd.read_excel(os.path.join(EXCEL_DIR, filename), sheet_name=SHEET, header=None)
+    years = sheet.iloc[0, 1:].astype(int).tolist()
+    body = sheet.iloc[1:]
+    provinces = body[0].map(lambda label: PROVINCES.get(_normalize(label)))
+    # A province row always precedes its regencies, some of which share its name (e.g. Gorontalo)
+    body = body[provinces.notna() & ~provinces.duplicated()]
+    provinces = provinces[body.index]
+
+    # Every block has one column per year; "-" marks a missing value
+    width = len(years) // len(blocks)
+    values = body.iloc[:, 1:].apply(pd.to_numeric, errors="coerce").to_numpy()
+    frames = []
+    for n, (column, scale) in enumerate(blocks):
+        index = pd.MultiIndex.from_product([provinces, years[n*width:(n+1)*width]], names=["Province", "Year"])
+        block = pd.Series(values[:, n*width:(n+1)*width].ravel() * scale, index=index, name=column)
+        if column in ZERO_IS_MISSING:
+            block = block.mask(block == 0)
+        frames.append(block)
+    parsed = pd.concat(frames, axis=1)
+
+    missing = set(PROVINCES.values()) - set(parsed.index.get_level_values("Province"))
+    if missing:
+        raise ValueError(f"{filename}: no rows for " + ", ".join(sorted(missing)))
+    return parsed
+
+
+def _cache_path(filename):
+    return os.path.join(CACHE_DIR, os.path.splitext(filename)[0] + ".parquet")
+
+
+def _read_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Parse the workbooks whose content hash or parser changed since the last run, reuse the rest
+def load_workbooks(force=False, workers=None):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    manifest = _read_manifest()
+    parser = file_hash(os.path.abspath(__file__))
+    hashes = {name: {"workbook": file_hash(os.path.join(EXCEL_DIR, name)), "parser": parser} for name in WORKBOOKS}
+    stale = [name for name in WORKBOOKS
+             if force or manifest.get(name) != hashes[name] or not os.path.exists(_cache_path(name))]
+
+    parsed = {}
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for name, frame in zip(stale, pool.map(parse_workbook, stale)):
+                frame.to_parquet(_cache_path(name))
+                manifest[name] = hashes[name]
+                parsed[name] = frame
+        with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    for name in WORKBOOKS:
+        if name not in parsed:
+            parsed[name] = pd.read_parquet(_cache_path(name))
+    return parsed, stale
+
+
+# Join the parsed workbooks into the wide schema of unp_pro_df.csv
+def build_dataset(parsed):
+    df = pd.concat([parsed[name] for name in WORKBOOKS], axis=1).sort_index()
+    for male, female in COMPLEMENTS.items():
+        df[male] = 1 - df[female]
+    return df.reset_index()[COLUMNS]
+
+
+def run(force=False, workers=None, csv_path=DATA_PATH, arrow_path=ARROW_PATH):
+    parsed, stale = load_workbooks(force=force, workers=workers)
+    df = build_dataset(parsed)
+    df.to_csv(csv_path)
+    write_compact(df, arrow_path, source_path=csv_path)
+    return df, stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the province dataset from the Excel workbooks.")
+    parser.add_argument("--force", action="store_true", help="re-parse every workbook")
+    parser.add_argument("--workers", type=int, default=None, help="size of the process pool")
+    parser.add_argument("--compact", action="store_true", help="only convert the current csv to the Arrow file")
+    args = parser.parse_args()
+    if args.compact:
+        write_compact(pd.read_csv(DATA_PATH, index_col=0))
+        print(f"Wrote {os.path.basename(ARROW_PATH)}")
+        return
+    df, stale = run(force=args.force, workers=args.workers)
+    print(f"Parsed {len(stale)} of {len(WORKBOOKS)} workbooks: {', '.join(stale) or 'none'}")
+    print(f"Wrote {len(df)} rows to {os.path.basename(DATA_PATH)} and {os.path.basename(ARROW_PATH)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Batched construction of the animated (year slider) figures.
+# Data is pivoted once into (frame x group) arrays; static styling lives on the base traces
+# and every frame only carries the attributes that change between years. The figure opens
+# on the last frame, like the px figures it replaces.
+import plotly.graph_objects as go
+
+
+def _nest(attributes):
+    # {'marker.size': v} -> {'marker': {'size': v}}
+    nested = {}
+    for path, value in attributes.items():
+        *parents, leaf = path.split('.')
+        node = nested
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    return nested
+
+
+def _merge(base, update):
+    merged = dict(base)
+    for key, value in update.items():
+        merged[key] = _merge(merged[key], value) if isinstance(value, dict) and isinstance(merged.get(key), dict) else value
+    return merged
+
+
+# One (frames x groups) array per column, groups in order of first appearance
+def _pivot(df, frame, group, columns):
+    wide = df.pivot(index=frame, columns=group, values=list(set(columns.values())))
+    groups = list(df[group].unique())
+    return list(wide.index), groups, {attr: wide[column][groups].to_numpy() for attr, column in columns.items()}
+
+
+# Slider and play/pause buttons matching plotly express
+def animation_layout(labels, redraw=False, prefix='Year=', active=None):
+    def options(duration):
+        return {'frame': {'duration': duration, 'redraw': redraw}, 'mode': 'immediate', 'fromcurrent': True,
+                'transition': {'duration': duration, 'easing': 'linear'}}
+    steps = [{'args': [[label], options(0)], 'label': label, 'method': 'animate'} for label in labels]
+    return {
+        'sliders': [{'active': len(labels) - 1 if active is None else active, 'currentvalue': {'prefix': prefix},
+                     'len': 0.9, 'pad': {'b': 10, 't': 60}, 'steps': steps, 'x': 0.1, 'xanchor': 'left',
+                     'y': 0, 'yanchor': 'top'}],
+        'updatemenus': [{'buttons': [{'args': [None, options(500)], 'label': '&#9654;', 'method': 'animate'},
+                                     {'args': [[None], options(0)], 'label': '&#9724;', 'method': 'animate'}],
+                         'direction': 'left', 'pad': {'r': 10, 't': 70}, 'showactive': False, 'type': 'buttons',
+                         'x': 0.1, 'xanchor': 'right', 'y': 0, 'yanchor': 'top'}],
+    }
+
+
+def _figure(traces, frames, labels, redraw):
+    return go.Figure(data=traces, frames=[{'name': label, 'data': data} for label, data in zip(labels, frames)],
+                     layout=animation_layout(labels, redraw=redraw))
+
+
+# One trace per group (e.g. a bubble per province), each frame holds one point per trace.
+# columns maps trace attributes to DataFrame columns: {'x': 'MaleLE', 'marker.size': 'Population'}
+# Returns the frame labels and {group: (base trace, per-frame entries)}, so a figure over any
+# subset of the groups can be assembled without rebuilding the other tracks.
+def grouped_tracks(df, columns, template, frame='Year', group='Province', colors=None):
+    labels, groups, values = _pivot(df, frame, group, columns)
+    trace_type = template['type']
+    tracks = {}
+    for j, name in enumerate(groups):
+        entries = [{'type': trace_type, **_nest({attr: [array[i, j]] for attr, array in values.items()})}
+                   for i in range(len(labels))]
+        style = {'name': name, 'legendgroup': name, 'showlegend': True, 'hovertext': [name], 'ids': [name]}
+        if colors:
+            style['marker'] = {'color': colors[name]}
+        tracks[name] = (_merge(_merge(template, style), entries[-1]), entries)
+    return [str(label) for label in labels], tracks
+
+
+def assemble_tracks(labels, tracks):
+    traces = [trace for trace, _ in tracks]
+    frames = [[entries[i] for _, entries in tracks] for i in range(len(labels))]
+    return _figure(traces, frames, labels, redraw=False)
+
+
+# A single trace over every group (e.g. a choropleth), each frame holds one array per attribute
+def single_trace_animation(df, columns, template, frame='Year', group='Province'):
+    labels, groups, values = _pivot(df, frame, group, columns)
+    trace_type = template['type']
+    frames = [[{'type': trace_type, **_nest({attr: array[i] for attr, array in values.items()})}]
+              for i in range(len(labels))]
+    style = {'locations': groups, 'hovertext': groups}
+    trace = _merge(_merge(template, style), frames[-1][0])
+    return _figure([trace], frames, [str(label) for label in labels], redraw=True)
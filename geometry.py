@@ -0,0 +1,251 @@
+# Province geometry used by the choropleth maps.
+# The GeoJSON bundled with the repo is parsed once per version of the file: the parsed and
+# simplified geometry lives in the data cache, so Streamlit reruns and concurrent sessions
+# share the same object, and an updated file is reloaded like the dataset.
+import argparse
+import csv
+import json
+import math
+import os
+from dataclasses import dataclass, replace
+
+from cache import DATA_PATH, GEOJSON_PATH, data_cache, deep_size, memoize
+
+FEATURE_ID_KEY = "properties.state"
+
+# Level-of-detail variants: Douglas-Peucker tolerance in degrees (0 = original geometry)
+LOD_TOLERANCES = {"full": 0, "high": 0.005, "medium": 0.02, "low": 0.05}
+MAP_ZOOM = 3.4
+TILE_SIZE = 512
+
+
+@dataclass(frozen=True)
+class ProvinceGeometry:
+    # Parsed FeatureCollection (shared by every session, see shared.py)
+    geojson: dict
+    # (min lon, min lat, max lon, max lat), same order as GeoDataFrame.total_bounds
+    bounds: tuple
+    center: dict
+    states: frozenset
+
+    @property
+    def nbytes(self):
+        return deep_size(self.geojson)
+
+
+# Walk the nested coordinate arrays of any geometry type and yield (lon, lat) pairs
+def _iter_points(coordinates):
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        yield coordinates[0], coordinates[1]
+        return
+    for part in coordinates:
+        yield from _iter_points(part)
+
+
+def total_bounds(features):
+    min_x = min_y = float("inf")
+    max_x = max_y = float("-inf")
+    for feature in features:
+        for x, y in _iter_points(feature["geometry"]["coordinates"]):
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+    return (min_x, min_y, max_x, max_y)
+
+
+def _data_provinces(data_path):
+    with open(data_path, newline="", encoding="utf-8") as f:
+        return {row["Province"] for row in csv.DictReader(f)}
+
+
+@memoize(data_cache)
+def load_province_geometry(geojson_path=GEOJSON_PATH, data_path=DATA_PATH):
+    with open(geojson_path, encoding="utf-8") as f:
+        geojson = json.load(f)
+    features = geojson["features"]
+
+    # Every map location is matched through properties.state, so a renamed province in
+    # either file would silently drop it from the maps. Fail loudly instead.
+    states = frozenset(feature["properties"]["state"] for feature in features)
+    unknown = states - _data_provinces(data_path)
+    if unknown:
+        raise ValueError(
+            f"GeoJSON states not found in the Province column of {os.path.basename(data_path)}: "
+            + ", ".join(sorted(unknown))
+        )
+
+    bounds = total_bounds(features)
+    center = {"lon": (bounds[0] + bounds[2]) / 2, "lat": (bounds[1] + bounds[3]) / 2}
+    return ProvinceGeometry(geojson=geojson, bounds=bounds, center=center, states=states)
+
+
+# Quantize a ring to the grid of the tolerance and drop repeated points
+def _quantize_ring(ring, decimals):
+    points = []
+    for x, y in ring:
+        point = (round(x, decimals), round(y, decimals))
+        if not points or points[-1] != point:
+            points.append(point)
+    if points[0] != points[-1]:
+        points.append(points[0])
+    return points
+
+
+# Points shared by several rings with different neighbours start or end a shared border.
+# Splitting rings there lets both sides of a border simplify to exactly the same line.
+def _junctions(rings):
+    neighbours = {}
+    junctions = set()
+    for ring in rings:
+        count = len(ring) - 1
+        for i in range(count):
+            pair = frozenset((ring[i - 1], ring[i + 1]))
+            seen = neighbours.setdefault(ring[i], pair)
+            if seen != pair:
+                junctions.add(ring[i])
+    return junctions
+
+
+# Douglas-Peucker on an open polyline, endpoints always kept
+def _simplify_line(points, tolerance):
+    if len(points) < 3:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (ax, ay), (bx, by) = points[first], points[last]
+        dx, dy = bx - ax, by - ay
+        norm = math.hypot(dx, dy)
+        index, distance = None, tolerance
+        for i in range(first + 1, last):
+            px, py = points[i]
+            d = abs(dy*(px - ax) - dx*(py - ay)) / norm if norm else math.hypot(px - ax, py - ay)
+            if d > distance:
+                index, distance = i, d
+        if index is not None:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _simplify_ring(ring, tolerance, junctions, arcs):
+    cuts = [i for i, point in enumerate(ring[:-1]) if point in junctions]
+    if not cuts:
+        cuts = [0]
+    # Rotate so the ring starts on a junction, then simplify it arc by arc
+    ring = ring[cuts[0]:-1] + ring[:cuts[0] + 1]
+    cuts = [i - cuts[0] for i in cuts] + [len(ring) - 1]
+    simplified = [ring[0]]
+    for start, end in zip(cuts, cuts[1:]):
+        arc = tuple(ring[start:end + 1])
+        reverse = arc[::-1]
+        # Shared arcs are walked in opposite directions by the two neighbouring provinces
+        key = min(arc, reverse)
+        if key not in arcs:
+            arcs[key] = _simplify_line(list(key), tolerance)
+        line = arcs[key] if key == arc else arcs[key][::-1]
+        simplified.extend(line[1:])
+    return simplified
+
+
+def _ring_area(ring):
+    return abs(sum(x0*y1 - x1*y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:]))) / 2
+
+
+# Topology-preserving simplification of a FeatureCollection at one tolerance, keeping only
+# the listed feature properties
+def simplify_geojson(geojson, tolerance, properties=("state",)):
+    decimals = max(0, math.ceil(-math.log10(tolerance))) + 1
+    features = []
+    for feature in geojson["features"]:
+        geometry = feature["geometry"]
+        polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+        features.append((feature, [[_quantize_ring(ring, decimals) for ring in polygon] for polygon in polygons]))
+    junctions = _junctions([ring for _, polygons in features for polygon in polygons for ring in polygon])
+
+    arcs = {}
+    simplified = []
+    for feature, polygons in features:
+        kept = []
+        for polygon in polygons:
+            rings = [_simplify_ring(ring, tolerance, junctions, arcs) for ring in polygon]
+            # Islands and holes smaller than the tolerance collapse below a valid ring
+            if len(rings[0]) >= 4:
+                kept.append([[list(point) for point in ring] for ring in rings if len(ring) >= 4])
+        if not kept:
+            largest = max((polygon[0] for polygon in polygons), key=_ring_area)
+            kept = [[[list(point) for point in largest]]]
+        simplified.append({
+            "type": "Feature",
+            "properties": {key: feature["properties"][key] for key in properties},
+            "geometry": {"type": "MultiPolygon", "coordinates": kept},
+        })
+    return {"type": "FeatureCollection", "features": simplified}
+
+
+@memoize(data_cache)
+def load_lod_geometry(lod):
+    geometry = load_province_geometry()
+    tolerance = LOD_TOLERANCES[lod]
+    if not tolerance:
+        return geometry
+    return replace(geometry, geojson=simplify_geojson(geometry.geojson, tolerance))
+
+
+# Zoom at which the bounds fill a width x height pixel map, less `padding` zoom levels
+# (equirectangular approximation, close enough near the equator)
+def zoom_for_bounds(bounds, width=1000, height=600, padding=0.5):
+    lon_span = max(bounds[2] - bounds[0], 1e-6)
+    lat_span = max(bounds[3] - bounds[1], 1e-6)
+    return math.log2(min(width / lon_span, height / lat_span) * 360 / TILE_SIZE) - padding
+
+
+# Largest simplification error that stays under half a screen pixel at the given zoom
+def tolerance_for_zoom(zoom=MAP_ZOOM):
+    return 360 / (TILE_SIZE * 2**zoom) / 2
+
+
+# Coarsest variant whose error stays under half a screen pixel at the given zoom
+def lod_for_zoom(zoom=MAP_ZOOM):
+    fitting = [lod for lod, tolerance in LOD_TOLERANCES.items() if tolerance <= tolerance_for_zoom(zoom)]
+    return max(fitting, key=LOD_TOLERANCES.get)
+
+
+def geometry_for_zoom(zoom=MAP_ZOOM):
+    return load_lod_geometry(lod_for_zoom(zoom))
+
+
+def geometry_size(geojson):
+    vertices = sum(len(ring) for feature in geojson["features"]
+                   for polygon in feature["geometry"]["coordinates"] for ring in polygon)
+    return vertices, len(json.dumps(geojson, separators=(",", ":")).encode())
+
+
+def lod_report():
+    rows = []
+    for lod, tolerance in LOD_TOLERANCES.items():
+        vertices, size = geometry_size(load_lod_geometry(lod).geojson)
+        rows.append({"lod": lod, "tolerance": tolerance, "vertices": vertices, "bytes": size})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report or write the simplified province geometry variants.")
+    parser.add_argument("--write", metavar="DIR", help="also write each variant as <DIR>/indonesia_<lod>.geojson")
+    args = parser.parse_args()
+    rows = lod_report()
+    for row in rows:
+        print(f"{row['lod']:>7}  tolerance={row['tolerance']:<6} vertices={row['vertices']:>6} "
+              f"bytes={row['bytes']:>7} ({row['bytes'] / rows[0]['bytes']:.0%})")
+    print(f"Maps at zoom {MAP_ZOOM} use '{lod_for_zoom()}'")
+    if args.write:
+        os.makedirs(args.write, exist_ok=True)
+        for lod in LOD_TOLERANCES:
+            with open(os.path.join(args.write, f"indonesia_{lod}.geojson"), "w", encoding="utf-8") as f:
+                json.dump(load_lod_geometry(lod).geojson, f, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    main()
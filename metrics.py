@@ -0,0 +1,62 @@
+# Derived gender metrics, computed in one vectorized pass over every province and year.
+# For each indicator pair (FemaleX, MaleX) the table holds the male - female gap (X_gap) and
+# the female / male ratio (X_ratio). Every value column, including GDI and GEM, also gets its
+# rank within the year (X_rank, 1 = highest) and its change from the previous year (X_delta).
+import numpy as np
+import pandas as pd
+
+import data
+from cache import memoize, slice_cache
+
+INDICATORS = ['LE', 'ASY', 'ESY', 'EPC', 'HDI', 'SI', 'IP', 'MP', 'PP']
+INDICES = ['GDI', 'GEM']
+NAMES = {'LE': 'Life Expectancy', 'ASY': 'Average Schooling Years', 'ESY': 'Expected Schooling Years',
+         'EPC': 'Expenditure per Capita', 'HDI': 'Human Development Index', 'SI': 'Share of Income',
+         'IP': 'Involvement in Parliament', 'MP': 'Managerial Position', 'PP': 'Professional Position'}
+# Columns offered by the indicator selector, with their labels
+CHOICES = {'GDI': 'Gender Development Index', 'GEM': 'Gender Empowerment Measure',
+           **{column: label for i in INDICATORS for column, label in
+              [(i + '_ratio', f'{NAMES[i]}, Female / Male'), (i + '_gap', f'{NAMES[i]}, Male - Female')]}}
+# Unit conversions applied before anything is derived: expenditure per capita in million IDR
+SCALES = {'EPC': 1e-6}
+# Identifier columns carried over from the input (Regency only in the regency tier)
+ID_COLUMNS = ['Province', 'Regency', 'Year', 'Population']
+
+
+def compute_metrics(df):
+    scale = np.array([SCALES.get(indicator, 1) for indicator in INDICATORS])
+    female = df[['Female' + i for i in INDICATORS]].to_numpy(dtype=float) * scale
+    male = df[['Male' + i for i in INDICATORS]].to_numpy(dtype=float) * scale
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = female / male
+    columns = (INDICES + ['Female' + i for i in INDICATORS] + ['Male' + i for i in INDICATORS]
+               + [i + '_gap' for i in INDICATORS] + [i + '_ratio' for i in INDICATORS])
+    values = pd.DataFrame(np.hstack([df[INDICES].to_numpy(dtype=float), female, male, male - female, ratio]),
+                          index=df.index, columns=columns)
+
+    # Ties keep the dataset order, so ranks match a stable descending sort of the year's rows
+    ranks = values.groupby(df['Year']).rank(ascending=False, method='first').add_suffix('_rank')
+    chronological = df.sort_values('Year', kind='stable').index
+    entity = [df[column].loc[chronological] for column in ('Province', 'Regency') if column in df]
+    deltas = values.loc[chronological].groupby(entity, observed=True).diff().loc[df.index].add_suffix('_delta')
+    return pd.concat([df[[column for column in ID_COLUMNS if column in df]], values, ranks, deltas], axis=1)
+
+
+@memoize(slice_cache)
+def load_metrics():
+    return data.Dataset(compute_metrics(data.load_dataset().frame))
+
+
+# One year of the metrics table, national row and selected provinces
+@memoize(slice_cache)
+def snapshot(year=data.LATEST_YEAR, provinces=None):
+    return data.select(load_metrics().year(year), provinces)
+
+
+# (position, value) of the national row among the year's rows sorted by column, descending.
+# The position is the bar index on a categorical axis sorted the same way; with a province
+# selection it counts only the selected provinces ranked above the national row.
+def national_position(column, year=data.LATEST_YEAR, provinces=None):
+    rows = snapshot(year, provinces)
+    national = rows[rows['Province'] == data.NATIONAL].iloc[0]
+    return int((rows[column + '_rank'] < national[column + '_rank']).sum()), national[column]
@@ -0,0 +1,97 @@
+# Ahead-of-time figure build.
+# Renders every registered chart to Plotly JSON with a manifest of input hashes. The app
+# loads these specs instead of building figures, as long as the manifest still matches the
+# data, geometry, chart code, plotly version and Streamlit version (the figures carry its
+# plotly template); otherwise it falls back to live building.
+#
+#   python prebuild.py                # writes prebuilt/<chart>.json and prebuilt/manifest.json
+#   python prebuild.py --out DIR
+import argparse
+import json
+import os
+import time
+
+import plotly
+import plotly.io as pio
+import streamlit
+
+import shared
+from cache import BASE_DIR, DATA_PATH, GEOJSON_PATH, REGENCY_DATA_PATH, REGENCY_GEOJSON_PATH, file_hash
+from compact import compact_figure, size
+
+PREBUILT_DIR = os.path.join(BASE_DIR, "prebuilt")
+MANIFEST_NAME = "manifest.json"
+# Everything a figure is a function of: the source files and the code that turns them into figures
+INPUT_PATHS = {
+    "unp_pro_df.csv": DATA_PATH,
+    "indonesia.geojson": GEOJSON_PATH,
+    **{name: os.path.join(BASE_DIR, name) for name in ("charts.py", "compact.py", "data.py", "frames.py", "geometry.py", "metrics.py", "regency.py")},
+    # The optional regency tier, when present
+    **{os.path.basename(path): path for path in (REGENCY_DATA_PATH, REGENCY_GEOJSON_PATH) if os.path.exists(path)},
+}
+
+
+def input_hashes():
+    hashes = {name: file_hash(path) for name, path in INPUT_PATHS.items()}
+    hashes["plotly"] = plotly.__version__
+    hashes["streamlit"] = streamlit.__version__
+    return hashes
+
+
+def read_manifest(out_dir=PREBUILT_DIR):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Manifest of the prebuilt specs, or None when they are missing or built from other inputs
+def valid_manifest(out_dir=PREBUILT_DIR):
+    manifest = read_manifest(out_dir)
+    if manifest is None or manifest.get("inputs") != input_hashes():
+        return None
+    return manifest
+
+
+def load_prebuilt(name, out_dir=PREBUILT_DIR):
+    manifest = valid_manifest(out_dir)
+    if manifest is None or name not in manifest["figures"]:
+        return None
+    with open(os.path.join(out_dir, manifest["figures"][name]["file"]), encoding="utf-8") as f:
+        spec = json.load(f)
+    # The spec was serialized by this plotly version from a validated figure
+    return shared.figure(spec)
+
+
+def build(out_dir=PREBUILT_DIR):
+    import charts
+    os.makedirs(out_dir, exist_ok=True)
+    figures = {}
+    for name, builder in charts.CHARTS.items():
+        start = time.perf_counter()
+        fig = builder()
+        spec = pio.to_json(compact_figure(fig), validate=False)
+        filename = f"{name}.json"
+        with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as f:
+            f.write(spec)
+        figures[name] = {"file": filename, "bytes": len(spec.encode()), "raw_bytes": size(fig),
+                         "build_seconds": round(time.perf_counter() - start, 4)}
+    manifest = {"inputs": input_hashes(), "figures": figures}
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialize every chart to Plotly JSON for the web app.")
+    parser.add_argument("--out", default=PREBUILT_DIR, help="output directory (default: prebuilt/)")
+    args = parser.parse_args()
+    manifest = build(args.out)
+    for name, entry in manifest["figures"].items():
+        print(f"{name:>16}  {entry['raw_bytes']:>9} -> {entry['bytes']:>9} bytes  {entry['build_seconds']:.3f}s")
+    print(f"Wrote {len(manifest['figures'])} figures to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Regency (kabupaten/kota) tier.
+# unp_reg_df.csv holds the province indicators for each regency (a Regency column next to
+# Province) and regencies.geojson their boundaries (properties.province, properties.regency).
+# Both are optional: without them the drilldown section is hidden. Province rows are rolled up
+# from the regencies as population-weighted means in one vectorized groupby. The geometry is
+# served one province at a time, simplified for the zoom that province is shown at, so a
+# drilldown map never carries the full-resolution boundaries of the whole country.
+#
+#   python regency.py --split     # write regencies/<province>.geojson, one file per province
+#   python regency.py --check     # compare the roll-ups with the published province rows
+import argparse
+import json
+import os
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import data
+import metrics
+from cache import BASE_DIR, REGENCY_DATA_PATH, REGENCY_GEOJSON_PATH, data_cache, memoize, slice_cache
+from geometry import ProvinceGeometry, simplify_geojson, tolerance_for_zoom, total_bounds, zoom_for_bounds
+
+# One FeatureCollection per province, written by `python regency.py --split`
+REGENCY_GEOMETRY_DIR = os.path.join(BASE_DIR, "regencies")
+REGENCY_ID_KEY = "properties.regency"
+PROPERTIES = ("province", "regency")
+# Columns rolled up to provinces, weighted by Population
+ROLLUP_COLUMNS = metrics.INDICES + ['Female' + i for i in metrics.INDICATORS] + ['Male' + i for i in metrics.INDICATORS]
+
+
+def available():
+    return os.path.exists(REGENCY_DATA_PATH) and (os.path.exists(REGENCY_GEOJSON_PATH) or os.path.isdir(REGENCY_GEOMETRY_DIR))
+
+
+@memoize(data_cache)
+def load_regencies(path=REGENCY_DATA_PATH):
+    return data.to_compact(pd.read_csv(path)).astype({'Regency': 'category'})
+
+
+# Population-weighted mean of every indicator per province and year, plus the national rows.
+# A regency missing a value or its population does not count towards that mean.
+def rollup(df):
+    df = df.reset_index(drop=True)
+    values = df[ROLLUP_COLUMNS].to_numpy(dtype=float)
+    population = df['Population'].to_numpy(dtype=float)
+    known = ~np.isnan(values) & ~np.isnan(population)[:, None]
+    weighted = pd.DataFrame(np.where(known, values * population[:, None], 0), columns=ROLLUP_COLUMNS)
+    weights = pd.DataFrame(np.where(known, population[:, None], 0), columns=ROLLUP_COLUMNS)
+    rows = []
+    for province in (df['Province'].astype(str), pd.Series(data.NATIONAL, index=df.index)):
+        keys = [province.rename('Province'), df['Year']]
+        total = weights.groupby(keys).sum()
+        means = weighted.groupby(keys).sum() / total.where(total > 0)
+        rows.append(means.assign(Population=df['Population'].groupby(keys).sum(min_count=1)).reset_index())
+    rolled = pd.concat(rows, ignore_index=True)[['Province', 'Year', 'Population'] + ROLLUP_COLUMNS]
+    return rolled.astype({'Province': 'category', 'Year': 'int16'}).round(data.DECIMALS)
+
+
+@memoize(slice_cache)
+def province_rollup():
+    return data.Dataset(metrics.compute_metrics(rollup(load_regencies())))
+
+
+@memoize(slice_cache)
+def load_regency_metrics():
+    return metrics.compute_metrics(load_regencies())
+
+
+@memoize(data_cache)
+def provinces():
+    return sorted(load_regencies()['Province'].astype(str).unique())
+
+
+# One province's regencies in one year, with the derived metrics
+@memoize(slice_cache)
+def drilldown(province, year=data.LATEST_YEAR):
+    table = load_regency_metrics()
+    return table[(table['Province'] == province) & (table['Year'] == year)]
+
+
+# Lowest and highest regency value of a column in a year, so every province shares one color range
+@memoize(slice_cache)
+def value_range(column, year=data.LATEST_YEAR):
+    table = load_regency_metrics()
+    values = table.loc[table['Year'] == year, column]
+    return float(values.min()), float(values.max())
+
+
+# Rolled-up value of a column for one province and year
+def province_value(province, year, column):
+    return province_rollup().value(province, year, column)
+
+
+@dataclass(frozen=True)
+class RegencyGeometry(ProvinceGeometry):
+    # Zoom at which the province fills the drilldown map
+    zoom: float = 0.0
+
+
+def _slug(province):
+    return re.sub(r"[^a-z0-9]+", "-", province.lower()).strip("-")
+
+
+# Regency features grouped by province, parsed from the full file (only when it is not split)
+@memoize(data_cache)
+def _features_by_province():
+    with open(REGENCY_GEOJSON_PATH, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    grouped = {}
+    for feature in features:
+        grouped.setdefault(feature["properties"]["province"], []).append(feature)
+    return grouped
+
+
+def _province_features(province):
+    path = os.path.join(REGENCY_GEOMETRY_DIR, _slug(province) + ".geojson")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["features"]
+    if not os.path.exists(REGENCY_GEOJSON_PATH):
+        return []
+    return _features_by_province().get(province, [])
+
+
+# One province's regencies, simplified to half a screen pixel at the zoom they are shown at
+# (shared by every session, see shared.py)
+@memoize(slice_cache)
+def load_regency_geometry(province):
+    features = _province_features(province)
+    if not features:
+        raise KeyError(f"No regency geometry for {province}")
+    bounds = total_bounds(features)
+    zoom = zoom_for_bounds(bounds)
+    geojson = simplify_geojson({"type": "FeatureCollection", "features": features}, tolerance_for_zoom(zoom), PROPERTIES)
+    center = {"lon": (bounds[0] + bounds[2]) / 2, "lat": (bounds[1] + bounds[3]) / 2}
+    return RegencyGeometry(geojson=geojson, bounds=bounds, center=center, zoom=zoom,
+                           states=frozenset(feature["properties"]["regency"] for feature in features))
+
+
+def split(out_dir=REGENCY_GEOMETRY_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    for province, features in _features_by_province().items():
+        with open(os.path.join(out_dir, _slug(province) + ".geojson"), "w", encoding="utf-8") as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f, separators=(",", ":"))
+        print(f"{province:<28} {len(features):>4} regencies")
+
+
+# Largest difference between the roll-ups and the published province rows, per column
+def check():
+    published = data.load_dataset().frame.astype({'Province': str})
+    rolled = rollup(load_regencies()).astype({'Province': str})
+    merged = published.merge(rolled, on=['Province', 'Year'], suffixes=('', '_rollup'))
+    return {column: float((merged[column] - merged[column + '_rollup']).abs().max())
+            for column in ['Population'] + ROLLUP_COLUMNS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare and check the regency tier.")
+    parser.add_argument("--split", action="store_true", help="write one regency GeoJSON per province")
+    parser.add_argument("--check", action="store_true", help="compare the roll-ups with the province rows")
+    args = parser.parse_args()
+    if args.split:
+        split()
+    if args.check:
+        for column, difference in check().items():
+            print(f"{column:>10}  max |published - rollup| = {difference:.6g}")
+
+
+if __name__ == "__main__":
+    main()
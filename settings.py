@@ -0,0 +1,17 @@
+# On/off settings of the app, read from environment variables (APP_SHARED_STATE, APP_LAZY_TABS,
+# APP_TELEMETRY) or query parameters.
+import os
+
+TRUTHY = {"1", "true", "yes", "on"}
+FALSY = {"0", "false", "no", "off"}
+
+
+# "1", "true", "yes" and "on" turn a setting on, "0", "false", "no" and "off" turn it off (in any
+# case); an empty or unknown value leaves it at its default
+def flag(value, default=False):
+    value = str(value).strip().lower()
+    return value in TRUTHY or (default and value not in FALSY)
+
+
+def env_flag(name, default=False):
+    return flag(os.environ.get(name, ""), default)
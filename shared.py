@@ -0,0 +1,103 @@
+# Read-only state shared by every session of the process.
+# Every value the caches hold (DataFrames, geometry, figure specs) is one object used by all
+# sessions: treat it as read-only, and copy it before changing it.
+# st.plotly_chart deep-copies a go.Figure (figure.to_dict()) on every rerun of every session,
+# which for a map is over 100 ms and a few MB of garbage. With shared state on (the default),
+# finished figures are cached once per process as plain spec dicts (SharedSpec). Only
+# plotly_chart() below wraps one in a SharedFigure, a handle whose to_dict() returns the spec
+# without copying it; charts.get_figure() still returns a regular go.Figure. Large values
+# repeated across specs (the map geometry) are interned, so every map points to one object.
+# data.py turns on pandas copy-on-write for the whole process in this mode, so modifying a
+# slice of a shared DataFrame never writes through to the frames other sessions read.
+# Set APP_SHARED_STATE=0 to keep a full go.Figure per cache entry instead.
+import hashlib
+import json
+import logging
+import threading
+
+import plotly.graph_objects as go
+
+from cache import deep_size
+from settings import env_flag
+
+ENABLED = env_flag("APP_SHARED_STATE", default=True)
+# Trace attributes whose values are interned across specs
+INTERNED_KEYS = ("geojson",)
+
+_interned = {}
+_intern_lock = threading.Lock()
+# Cleared when st.plotly_chart rejects the SharedFigure handle
+_handle_supported = True
+
+
+class SharedSpec(dict):
+    # Finished figure spec (shared, see above). nbytes does not count the interned values, which
+    # belong to every spec that uses them.
+    nbytes = 0
+
+
+class UnsupportedAttribute(AttributeError):
+    pass
+
+
+class SharedFigure(go.Figure):
+    # st.plotly_chart argument made by plotly_chart(). plotly.tools accepts it as a go.Figure and
+    # only calls to_dict(), which returns the shared spec without copying it. The plotly object
+    # tree is never built, so every other attribute raises.
+    def __init__(self, spec):
+        object.__setattr__(self, "_spec", spec)
+
+    def __getattribute__(self, name):
+        if name in ("to_dict", "_spec") or (name.startswith("__") and name.endswith("__")):
+            return object.__getattribute__(self, name)
+        raise UnsupportedAttribute(f"SharedFigure only supports to_dict() for st.plotly_chart, not .{name}; "
+                                   "use charts.get_figure() for a go.Figure")
+
+    def to_dict(self):
+        return self._spec
+
+    def __repr__(self):
+        return f"SharedFigure({len(self._spec.get('data', []))} traces)"
+
+
+def intern(value):
+    key = hashlib.sha256(json.dumps(value, separators=(",", ":")).encode()).hexdigest()
+    with _intern_lock:
+        return _interned.setdefault(key, value)
+
+
+# What the figure cache holds for a serialized spec: a SharedSpec, or a go.Figure when shared
+# state is off
+def figure(spec):
+    if not ENABLED:
+        return go.Figure(spec, _validate=False)
+    interned = []
+    for trace in spec.get("data", []):
+        for key in INTERNED_KEYS:
+            if key in trace:
+                trace[key] = intern(trace[key])
+                interned.append(trace[key])
+    spec = SharedSpec(spec)
+    spec.nbytes = deep_size(spec, skip=interned)
+    return spec
+
+
+# A cached figure as a go.Figure of its own, for code that uses the plotly API
+def to_figure(value):
+    return go.Figure(value, _validate=False) if isinstance(value, SharedSpec) else value
+
+
+# st.plotly_chart of a cached figure. The SharedFigure handle relies on plotly.tools calling
+# nothing but to_dict(); if a Streamlit or plotly release uses more of it, the figure is sent as a
+# regular go.Figure instead and the handle is not used again in this process.
+def plotly_chart(value, **kwargs):
+    global _handle_supported
+    import streamlit as st
+    if _handle_supported and isinstance(value, SharedSpec):
+        try:
+            return st.plotly_chart(SharedFigure(value), **kwargs)
+        except UnsupportedAttribute as exc:
+            _handle_supported = False
+            logging.getLogger(__name__).warning("st.plotly_chart rejected the SharedFigure handle (%s); "
+                                                "sending regular figures", exc)
+    return st.plotly_chart(to_figure(value), **kwargs)
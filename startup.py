@@ -0,0 +1,148 @@
+# Startup profile and import budget.
+# Heavy dependencies are imported by the code paths that need them. plotly.express is loaded
+# only when a figure has to be built, not when it comes from prebuilt/ or the figure cache. The
+# map bounds come from geometry.total_bounds, so no GIS stack is imported at all.
+# `python startup.py` runs main.py once in a fresh interpreter under -X importtime and once under
+# tracemalloc, and sums both per package: import time, the memory its code still holds after the
+# first run and the import that pulled it in.
+#
+#   python startup.py                                # report
+#   python startup.py --max-seconds 2 --max-mb 300   # exit 1 when startup is over budget
+#   python startup.py --output startup.json
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, "main.py")
+# Packages startup must never import (--forbid adds more)
+FORBIDDEN = ("geopandas", "shapely", "pyproj", "fiona", "pyogrio", "requests")
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+# Top-level package a source file belongs to: the first path component under its sys.path entry
+def _package(filename, roots):
+    for root in roots:
+        if filename.startswith(root + os.sep):
+            return filename[len(root) + 1:].split(os.sep)[0].removesuffix(".py")
+    return "<other>"
+
+
+def run_app(memory):
+    import logging
+    import runpy
+    import tracemalloc
+    import warnings
+    warnings.simplefilter("ignore")
+    logging.disable(logging.WARNING)
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    runpy.run_path(APP_PATH, run_name="__main__")
+    result = {"wall_seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+    if memory:
+        # Longest sys.path entries first, so site-packages wins over the stdlib directory
+        roots = sorted({os.path.abspath(path) for path in sys.path if path}, key=len, reverse=True)
+        packages = defaultdict(int)
+        for stat in tracemalloc.take_snapshot().statistics("filename"):
+            packages[_package(stat.traceback[0].filename, roots)] += stat.size
+        result["memory_mb"] = {name: size / 2**20 for name, size in packages.items()}
+    return result
+
+
+# -X importtime lines -> {package: {self_seconds, modules, via}}. The lines are printed children
+# first; read backwards, every module comes right after the module that imported it, and "via"
+# is the outermost import of its chain (what the app or a library call first imported).
+def parse_importtime(stderr):
+    packages = defaultdict(lambda: {"self_seconds": 0.0, "modules": 0, "via": set()})
+    chain = []
+    for line in reversed(stderr.splitlines()):
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, field = line[len("import time:"):].split("|")
+        name = field.strip()
+        depth = (len(field) - len(field.lstrip()) - 1) // 2
+        chain[depth:] = [name]
+        package = packages[name.partition(".")[0]]
+        package["self_seconds"] += int(self_us) / 1e6
+        package["modules"] += 1
+        if chain[0].partition(".")[0] != name.partition(".")[0]:
+            package["via"].add(chain[0])
+    return packages
+
+
+def _child(mode, *options):
+    return subprocess.run([sys.executable, *options, os.path.abspath(__file__), "--child", mode], cwd=BASE_DIR,
+                          check=True, capture_output=True, text=True)
+
+
+def profile():
+    timed = _child("time", "-X", "importtime")
+    result = json.loads(timed.stdout.strip().splitlines()[-1])
+    memory = json.loads(_child("memory").stdout.strip().splitlines()[-1])["memory_mb"]
+    packages = parse_importtime(timed.stderr)
+    result["import_seconds"] = sum(package["self_seconds"] for package in packages.values())
+    result["packages"] = {name: {**package, "via": sorted(package["via"]), "memory_mb": memory.get(name, 0.0)}
+                          for name, package in sorted(packages.items(), key=lambda item: -item[1]["self_seconds"])}
+    return result
+
+
+def report(result, top):
+    lines = [f"startup {result['wall_seconds']:.2f}s, imports {result['import_seconds']:.2f}s, "
+             f"peak RSS {result['peak_rss_mb']:.1f} MB",
+             f"{'package':<20} {'import':>8} {'modules':>8} {'memory':>9}  imported via"]
+    for name, package in list(result["packages"].items())[:top]:
+        via = ", ".join(package["via"][:3]) + (", ..." if len(package["via"]) > 3 else "")
+        lines.append(f"{name:<20} {package['self_seconds']:7.3f}s {package['modules']:>8} "
+                     f"{package['memory_mb']:6.1f} MB  {via}")
+    return "\n".join(lines)
+
+
+# Budget violations as messages
+def violations(result, max_seconds=None, max_mb=None, forbidden=FORBIDDEN):
+    found = [f"{name} is imported at startup" for name in forbidden if name in result["packages"]]
+    if max_seconds is not None and result["import_seconds"] > max_seconds:
+        found.append(f"imports take {result['import_seconds']:.2f}s, budget {max_seconds:.2f}s")
+    if max_mb is not None and result["peak_rss_mb"] > max_mb:
+        found.append(f"peak RSS is {result['peak_rss_mb']:.1f} MB, budget {max_mb:.1f} MB")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the imports and memory of the app's startup.")
+    parser.add_argument("--max-seconds", type=float, help="budget for the total import time")
+    parser.add_argument("--max-mb", type=float, help="budget for the peak RSS")
+    parser.add_argument("--forbid", action="append", default=[], metavar="PACKAGE",
+                        help=f"also fail when this package is imported (always: {', '.join(FORBIDDEN)})")
+    parser.add_argument("--top", type=int, default=20, help="packages to list (default 20)")
+    parser.add_argument("--output", help="write the profile as JSON")
+    parser.add_argument("--child", choices=["time", "memory"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_app(args.child == "memory")))
+        return
+
+    result = profile()
+    print(report(result, args.top))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    found = violations(result, args.max_seconds, args.max_mb, FORBIDDEN + tuple(args.forbid))
+    for message in found:
+        print(f"OVER BUDGET {message}")
+    if found:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
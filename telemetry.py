@@ -0,0 +1,172 @@
+# Opt-in per-section and per-chart telemetry for the web app.
+# Enable with APP_TELEMETRY=1 or the ?telemetry=1 query parameter. Each run then records the
+# wall time of every page section and chart, split into DataFrame work, figure building and
+# rendering, plus the bytes of figure JSON sent to the browser. Records are logged as JSON
+# lines on the "telemetry" logger and shown in a debug panel at the bottom of the page.
+# When disabled every hook returns a shared no-op, so it can stay wired in production.
+import json
+import logging
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+
+from settings import env_flag, flag
+
+ENV_VAR = "APP_TELEMETRY"
+QUERY_PARAM = "telemetry"
+# Cache tier -> which part of the time it is attributed to
+TIERS = {"data": "dataframe_seconds", "slices": "dataframe_seconds", "figures": "figure_seconds"}
+
+logger = logging.getLogger("telemetry")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_NULL = nullcontext()
+_local = threading.local()
+
+
+class Run:
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self.start = time.perf_counter()
+        self.sections = []
+        self.charts = []
+        self.section = None
+        self.target = None
+        # Open timers: [field, start, time spent in nested timers]
+        self._stack = []
+
+    def push(self, field):
+        self._stack.append([field, time.perf_counter(), 0.0])
+
+    # Time spent in nested timers is attributed to them, not to the enclosing one
+    def pop(self):
+        field, start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        if self.target is not None:
+            self.target[field] = self.target.get(field, 0.0) + elapsed - nested
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        return elapsed
+
+
+class _Timer:
+    def __init__(self, run, field):
+        self.run = run
+        self.field = field
+
+    def __enter__(self):
+        self.run.push(self.field)
+
+    def __exit__(self, *exc):
+        self.run.pop()
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+# Start recording this script run if telemetry is enabled; call at the top of the app
+def start_run():
+    import streamlit as st
+    enabled = env_flag(ENV_VAR) or flag(st.query_params.get(QUERY_PARAM, ""))
+    _local.run = Run() if enabled else None
+    return _local.run
+
+
+# Time a cache build (called by MemoCache on a miss)
+def measure(tier):
+    run = current_run()
+    if run is None or run.target is None:
+        return _NULL
+    return _Timer(run, TIERS.get(tier, "other_seconds"))
+
+
+class _Section:
+    def __init__(self, run, name):
+        self.run = run
+        self.record = {"section": name, "charts": 0, "bytes": 0}
+
+    def __enter__(self):
+        self.run.section = self.record
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.record["wall_seconds"] = time.perf_counter() - self.start
+        self.run.section = None
+        self.run.sections.append(self.record)
+        _log("section", self.run, self.record)
+
+
+# Context manager around one page section: with col1_2, telemetry.section("col1"): ...
+def section(name):
+    run = current_run()
+    if run is None:
+        return _NULL
+    return _Section(run, name)
+
+
+# st.plotly_chart of a chart's cached figure, timed and sized when telemetry is enabled
+def plotly_chart(name, inputs=None, **kwargs):
+    from charts import cached_figure
+    from shared import plotly_chart as render
+    run = current_run()
+    if run is None:
+        return render(cached_figure(name, inputs), **kwargs)
+
+    import plotly.io as pio
+    section = run.section
+    record = {"section": section["section"] if section else None, "chart": name,
+              "dataframe_seconds": 0.0, "figure_seconds": 0.0}
+    start = time.perf_counter()
+    run.target = record
+    try:
+        with _Timer(run, "figure_seconds"):
+            figure = cached_figure(name, inputs)
+    finally:
+        run.target = None
+    # Same serialization st.plotly_chart sends to the browser
+    record["bytes"] = len(pio.to_json(figure, validate=False).encode())
+    render_start = time.perf_counter()
+    element = render(figure, **kwargs)
+    record["render_seconds"] = time.perf_counter() - render_start
+    record["wall_seconds"] = time.perf_counter() - start
+    run.charts.append(record)
+    if section:
+        section["charts"] += 1
+        section["bytes"] += record["bytes"]
+    _log("chart", run, record)
+    return element
+
+
+def _log(event, run, record):
+    rounded = {key: round(value, 6) if isinstance(value, float) else value for key, value in record.items()}
+    logger.info(json.dumps({"event": event, "run": run.id, **rounded}))
+
+
+def summary(run):
+    return {"wall_seconds": time.perf_counter() - run.start, "sections": len(run.sections),
+            "charts": len(run.charts), "bytes": sum(record["bytes"] for record in run.charts)}
+
+
+# Log the run summary and show the debug panel; call at the end of the app
+def render_panel():
+    run = current_run()
+    if run is None:
+        return
+    import streamlit as st
+    from cache import CACHES
+    totals = summary(run)
+    _log("run", run, totals)
+    with st.expander(f"Telemetry (run {run.id})"):
+        st.markdown(f"**{totals['wall_seconds']:.3f}s** for {totals['sections']} sections and "
+                    f"{totals['charts']} charts, **{totals['bytes'] / 1024:.0f} KB** of figure JSON")
+        st.dataframe(run.sections, use_container_width=True)
+        st.dataframe(run.charts, use_container_width=True)
+        st.dataframe([cache.stats() for cache in CACHES], use_container_width=True)
+    _local.run = None
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import charts
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Streamlit runs every session on its own thread, so the first figures of a fresh process can be
+# built concurrently, each importing plotly.express on its own
+CONCURRENT_BUILDS = """
+import sys
+import threading
+
+import charts
+
+names = ["gdi_bar", "asy_gap_line", "asy_diff_bar", "epc_line", "gem_line", "gem_bar", "si_bar", "indicator_bar"]
+assert "plotly.express" not in sys.modules
+barrier = threading.Barrier(len(names))
+errors = []
+
+
+def build(name):
+    barrier.wait()
+    try:
+        charts.CHARTS[name]()
+    except Exception as exc:
+        errors.append(f"{name}: {exc!r}")
+
+
+threads = [threading.Thread(target=build, args=(name,)) for name in names]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print("\\n".join(errors))
+sys.exit(1 if errors else 0)
+"""
+
+
+def test_concurrent_first_builds_in_a_fresh_process():
+    result = subprocess.run([sys.executable, "-c", CONCURRENT_BUILDS], cwd=BASE_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr[-2000:]
+
+
+def test_a_year_change_rebuilds_only_the_charts_that_depend_on_the_year(monkeypatch):
+    built = []
+    monkeypatch.setattr(charts, "_load_or_build", lambda name, *args: built.append(name) or {})
+    charts.figure_cache.clear()
+    try:
+        for name in charts.CHARTS:
+            charts.cached_figure(name)
+        built.clear()
+        for name in charts.CHARTS:
+            charts.cached_figure(name, {"year": 2015})
+    finally:
+        charts.figure_cache.clear()
+    assert set(built) == {name for name, inputs in charts.CHART_INPUTS.items() if "year" in inputs}
+    assert 0 < len(built) < len(charts.CHARTS)
@@ -0,0 +1,40 @@
+from geometry import simplify_geojson
+
+
+def _feature(state, ring):
+    return {"type": "Feature", "properties": {"state": state, "name": state},
+            "geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+
+# Border at x = 1 between a 1x2 rectangle (West) and a unit square (East): a bump larger than
+# the tolerance and wiggles smaller than it. West's edge continues straight past the border's
+# end at (1, 1), so only the shared-arc handling keeps that point on West's side.
+BORDER = [(1, 0), (1.002, 0.1), (0.998, 0.2), (1.2, 0.5), (1.001, 0.8), (0.999, 0.9), (1, 1)]
+WEST = [(0, 0)] + BORDER + [(1, 2), (0, 2), (0, 0)]
+# Starts at another point and walks the border the other way
+EAST = [(2, 1)] + BORDER[::-1] + [(2, 0), (2, 1)]
+GEOJSON = {"type": "FeatureCollection", "features": [_feature("West", WEST), _feature("East", EAST)]}
+
+
+def _points(feature):
+    return [tuple(point) for polygon in feature["geometry"]["coordinates"] for ring in polygon for point in ring]
+
+
+def test_neighbours_keep_an_identical_shared_border():
+    west, east = simplify_geojson(GEOJSON, 0.01)["features"]
+    # The border is every vertex of West right of x = 0.5 up to y = 1, and every vertex of East left of x = 1.5
+    west_border = [point for point in _points(west) if point[0] > 0.5 and point[1] <= 1]
+    east_border = [point for point in _points(east) if point[0] < 1.5]
+    assert set(west_border) == set(east_border)
+    # The bump survives, the wiggles next to the corners do not
+    assert (1.2, 0.5) in west_border
+    assert (1.002, 0.1) not in west_border and (0.999, 0.9) not in west_border
+
+
+def test_simplified_features_are_closed_multipolygons_with_the_listed_properties():
+    for feature in simplify_geojson(GEOJSON, 0.01)["features"]:
+        assert feature["properties"].keys() == {"state"}
+        assert feature["geometry"]["type"] == "MultiPolygon"
+        for polygon in feature["geometry"]["coordinates"]:
+            for ring in polygon:
+                assert ring[0] == ring[-1] and len(ring) >= 4
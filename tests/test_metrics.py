@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+import metrics
+
+PROVINCES = ["Aceh", "Bali", "Papua", "Riau"]
+YEARS = [2020, 2021]
+
+
+# Every province in every year, rows in shuffled order, with ties in GDI within a year
+def _frame():
+    rng = np.random.default_rng(0)
+    rows = []
+    for year in YEARS:
+        for n, province in enumerate(PROVINCES):
+            row = {"Province": province, "Year": year, "Population": 1000.0 * (n + 1),
+                   "GDI": [90.0, 92.5, 90.0, 88.0][n] + (year - 2020), "GEM": rng.uniform(50, 80)}
+            for indicator in metrics.INDICATORS:
+                row["Female" + indicator] = rng.uniform(1, 2)
+                row["Male" + indicator] = rng.uniform(1, 2)
+            rows.append(row)
+    df = pd.DataFrame(rows)
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+
+def test_rank_matches_a_stable_descending_sort():
+    df = _frame()
+    table = metrics.compute_metrics(df)
+    for column in ("GDI", "LE_gap", "HDI_ratio"):
+        for _, rows in table.groupby("Year"):
+            ordered = rows.sort_values(column, ascending=False, kind="stable")
+            assert ordered[column + "_rank"].tolist() == list(range(1, len(rows) + 1))
+
+
+def test_delta_is_the_change_from_the_previous_year_of_the_same_province():
+    table = metrics.compute_metrics(_frame()).set_index(["Province", "Year"])
+    for province in PROVINCES:
+        assert np.isnan(table.loc[(province, 2020), "GDI_delta"])
+        assert table.loc[(province, 2021), "GDI_delta"] == 1.0
+        expected = table.loc[(province, 2021), "FemaleLE"] - table.loc[(province, 2020), "FemaleLE"]
+        assert table.loc[(province, 2021), "FemaleLE_delta"] == expected
+
+
+def test_gap_and_ratio_use_the_scaled_values():
+    df = _frame()
+    table = metrics.compute_metrics(df)
+    assert np.allclose(table["EPC_gap"], (df["MaleEPC"] - df["FemaleEPC"]) * metrics.SCALES["EPC"])
+    assert np.allclose(table["LE_ratio"], df["FemaleLE"] / df["MaleLE"])
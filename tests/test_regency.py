@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data
+import regency
+
+
+# Aceh: the third regency has no population, the second no FemaleLE. Bali: FemaleLE is missing
+# in its only regency.
+def _frame():
+    rows = [("Aceh", "Aceh Besar", 100.0, 90.0, 70.0),
+            ("Aceh", "Aceh Jaya", 300.0, 94.0, np.nan),
+            ("Aceh", "Simeulue", np.nan, 50.0, 80.0),
+            ("Bali", "Badung", 200.0, 86.0, np.nan)]
+    df = pd.DataFrame(rows, columns=["Province", "Regency", "Population", "GDI", "FemaleLE"])
+    for column in regency.ROLLUP_COLUMNS:
+        if column not in df:
+            df[column] = 1.0
+    return df.assign(Year=2021)
+
+
+def _rolled():
+    return regency.rollup(_frame()).astype({"Province": str}).set_index(["Province", "Year"])
+
+
+def test_rollup_skips_regencies_without_population():
+    rolled = _rolled()
+    assert rolled.loc[("Aceh", 2021), "GDI"] == pytest.approx((90 * 100 + 94 * 300) / 400)
+    assert rolled.loc[("Aceh", 2021), "Population"] == 400
+    assert rolled.loc[(data.NATIONAL, 2021), "GDI"] == pytest.approx((90 * 100 + 94 * 300 + 86 * 200) / 600, abs=0.005)
+    assert rolled.loc[(data.NATIONAL, 2021), "Population"] == 600
+
+
+def test_rollup_skips_regencies_without_a_value():
+    rolled = _rolled()
+    assert rolled.loc[("Aceh", 2021), "FemaleLE"] == 70
+    assert np.isnan(rolled.loc[("Bali", 2021), "FemaleLE"])
+    assert rolled.loc[(data.NATIONAL, 2021), "FemaleLE"] == 70
+    assert (rolled["MaleLE"] == 1).all()
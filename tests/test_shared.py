@@ -0,0 +1,38 @@
+import json
+
+from streamlit.testing.v1 import AppTest
+
+import shared
+
+
+# A cached figure rendered the way the app renders it
+def _app():
+    import plotly.graph_objects as go
+
+    import shared
+    spec = go.Figure(go.Bar(x=["Aceh", "Bali"], y=[90.5, 92.5]), layout={"title": {"text": "Shared"}}).to_dict()
+    shared.plotly_chart(shared.SharedSpec(spec))
+
+
+def _sent(at):
+    assert not at.exception
+    spec = json.loads(at.get("plotly_chart")[0].proto.spec)
+    assert spec["data"][0]["y"] == [90.5, 92.5]
+    assert spec["layout"]["title"]["text"] == "Shared"
+
+
+def test_st_plotly_chart_accepts_the_shared_figure(monkeypatch):
+    monkeypatch.setattr(shared, "_handle_supported", True)
+    _sent(AppTest.from_function(_app).run())
+    assert shared._handle_supported
+
+
+# A Streamlit or plotly release that uses more of the figure than to_dict()
+def test_rejected_shared_figure_falls_back_to_a_regular_figure(monkeypatch):
+    def to_dict(self):
+        raise shared.UnsupportedAttribute("to_dict")
+
+    monkeypatch.setattr(shared, "_handle_supported", True)
+    monkeypatch.setattr(shared.SharedFigure, "to_dict", to_dict)
+    _sent(AppTest.from_function(_app).run())
+    assert not shared._handle_supported
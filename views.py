@@ -0,0 +1,48 @@
+# Page building blocks shared by the sections of main.py.
+# Tabbed charts are lazy: only the selected tab's chart is built and sent to the browser,
+# and switching tabs reruns just that section (a fragment) instead of the whole page. A
+# hidden chart is built on first access and then served from the figure cache.
+# Set APP_LAZY_TABS=0 to render every tab eagerly.
+
+import streamlit as st
+
+import data
+import metrics
+import regency
+import telemetry
+from settings import env_flag
+
+LAZY_TABS = env_flag("APP_LAZY_TABS", default=True)
+
+
+# Sidebar selectors, returned as the filter inputs of charts.cached_figure
+def filters():
+    dataset = data.load_dataset()
+    provinces = sorted(name for name in dataset.province_names if name != data.NATIONAL)
+    with st.sidebar:
+        st.markdown("### Filters")
+        year = st.select_slider("Year", sorted(dataset.years), value=data.LATEST_YEAR, key="year")
+        selected = st.multiselect("Provinces", provinces, key="provinces", placeholder="All provinces")
+        indicator = st.selectbox("Indicator", list(metrics.CHOICES), format_func=metrics.CHOICES.get, key="indicator")
+    # A canonical value per selection, so the same selection always hits the same cache entries
+    return {'year': year, 'provinces': tuple(sorted(selected)) or None, 'indicator': indicator}
+
+
+# tabs maps each tab label to the chart it shows: {"Map (2010-2021)": "gdi_map", ...}
+@st.fragment
+def chart_tabs(key, tabs, inputs=None, **kwargs):
+    containers = st.tabs(list(tabs), key=key, on_change="rerun" if LAZY_TABS else "ignore")
+    for container, name in zip(containers, tabs.values()):
+        if LAZY_TABS and not container.open:
+            continue
+        with container:
+            telemetry.plotly_chart(name, inputs, **kwargs)
+
+
+# Regencies of one province; picking another province reruns just this section
+@st.fragment
+def regency_drilldown(inputs, **kwargs):
+    province = st.selectbox("Province", regency.provinces(), key="drilldown")
+    inputs = {**inputs, 'province': province}
+    telemetry.plotly_chart('regency_map', inputs, **kwargs)
+    telemetry.plotly_chart('regency_bar', inputs, **kwargs)